@@ -0,0 +1,64 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from currency import CURRENCIES, CURRENCY_LOCALE, format_amounts, format_currency
+
+ROWS = int(os.environ.get("BENCH_ROWS", 1_000_000))
+REPEAT = int(os.environ.get("BENCH_REPEAT", 3))
+MIXED = ["USD", "EUR", "GBP", "JPY", "DKK", "KWD"]
+
+# format_currency as it was before formatters were cached: a lookup and an
+# f-string per call, en_US separators only.
+def format_currency_inline(amount, currency_code):
+    curr = CURRENCIES.get(currency_code, CURRENCIES["USD"])
+    formatted = f"{amount:,.{curr['decimals']}f}"
+    if curr["position"] == "before":
+        return f"{curr['symbol']}{formatted}"
+    return f"{formatted}{curr['symbol']}"
+
+# Best of REPEAT runs; the rest is scheduler noise.
+def timed(label, fn):
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"  {label:28} {best:7.3f} s")
+    return result
+
+def main():
+    rng = random.Random(7)
+    amounts = [round(rng.uniform(-5000, 250000), 2) for _ in range(ROWS)]
+    column = np.asarray(amounts)
+    currencies = [rng.choice(MIXED) for _ in range(ROWS)]
+    print(f"{ROWS} amounts")
+
+    for currency_code, locale in [("USD", "en_US"), ("EUR", "de_DE"), ("EUR", "fr_FR")]:
+        print(f"{currency_code} {locale}")
+        if locale == "en_US":
+            timed("inline per call", lambda: [format_currency_inline(a, currency_code) for a in amounts])
+        if locale == CURRENCY_LOCALE:
+            timed("format_currency, no locale", lambda: [format_currency(a, currency_code) for a in amounts])
+        single = timed("format_currency per call", lambda: [format_currency(a, currency_code, locale) for a in amounts])
+        batch = timed("format_amounts (list)", lambda: format_amounts(amounts, currency_code, locale))
+        timed("format_amounts (ndarray)", lambda: format_amounts(column, currency_code, locale))
+        assert batch == single
+
+    for locale in ("en_US", "de_DE"):
+        print(f"mixed currencies, {locale}")
+        if locale == "en_US":
+            timed("inline per call", lambda: [format_currency_inline(a, c) for a, c in zip(amounts, currencies)])
+        if locale == CURRENCY_LOCALE:
+            timed("format_currency, no locale", lambda: [format_currency(a, c) for a, c in zip(amounts, currencies)])
+        single = timed("format_currency per call", lambda: [format_currency(a, c, locale) for a, c in zip(amounts, currencies)])
+        batch = timed("format_amounts", lambda: format_amounts(amounts, currencies, locale))
+        assert batch == single
+
+if __name__ == "__main__":
+    main()
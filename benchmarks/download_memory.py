@@ -0,0 +1,63 @@
+import base64
+import os
+import sys
+import tracemalloc
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+from invoice_pdf import create_invoice_pdf
+
+ITEM_COUNT = int(os.environ.get("BENCH_ITEMS", 2000))
+
+def sample_invoice():
+    items = [{"desc": f"Consulting block {i}", "qty": 1 + i % 5, "rate": 125.0, "total": (1 + i % 5) * 125.0} for i in range(ITEM_COUNT)]
+    subtotal = sum(item["total"] for item in items)
+    return {
+        "invoice_number": "INV-BENCH-001",
+        "invoice_date": date(2025, 1, 1),
+        "due_date": date(2025, 1, 31),
+        "your_name": "Alex Rivers",
+        "your_email": "alex@yourcompany.com",
+        "your_address": "123 Main St\nLos Angeles, CA 90001",
+        "client_name": "Acme Corp",
+        "client_email": "billing@acme.com",
+        "client_address": "456 Corporate Blvd\nSan Francisco, CA 94111",
+        "currency": "USD",
+        "items": items,
+        "subtotal": subtotal,
+        "tax_rate": 8,
+        "tax": subtotal * 0.08,
+        "total": subtotal * 1.08,
+        "notes": "Thank you for your business!"
+    }
+
+# The markdown data-URI link that main.py and ninja.py used to emit.
+def data_uri_handoff(pdf_buffer):
+    b64 = base64.b64encode(pdf_buffer.read()).decode()
+    href = f'<a href="data:application/pdf;base64,{b64}" download="Invoice.pdf">Download</a>'
+    return len(href)
+
+# What st.download_button does with the BytesIO handed over by pdf_download_button.
+def download_button_handoff(pdf_buffer):
+    data, _ = convert_data_to_bytes_and_infer_mime(pdf_buffer, unsupported_error=TypeError())
+    return len(data)
+
+def measure(handoff, invoice):
+    pdf_buffer = create_invoice_pdf(invoice)
+    tracemalloc.start()
+    payload = handoff(pdf_buffer)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(pdf_buffer.getbuffer()), payload, peak
+
+def main():
+    invoice = sample_invoice()
+    for name, handoff in [("data-uri", data_uri_handoff), ("download_button", download_button_handoff)]:
+        pdf_size, payload, peak = measure(handoff, invoice)
+        print(f"{name:>16}: pdf={pdf_size / 1024:8.1f} KiB  payload={payload / 1024:8.1f} KiB  extra peak={peak / 1024:8.1f} KiB")
+
+if __name__ == "__main__":
+    main()
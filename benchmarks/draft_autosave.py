@@ -0,0 +1,53 @@
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from drafts import DraftWriter, draft_defaults
+
+# Time is compressed by SPEEDUP so a few minutes of editing replays in seconds;
+# the writer's interval and idle window are scaled by the same factor.
+SPEEDUP = float(os.environ.get("BENCH_SPEEDUP", 10))
+EDITS = int(os.environ.get("BENCH_EDITS", 300))
+
+def edit_session(seed=7):
+    rng = random.Random(seed)
+    fields = list(draft_defaults())
+    for i in range(EDITS):
+        field = rng.choice(fields)
+        # Mostly quick successive edits, with the occasional pause to think.
+        gap = rng.uniform(0.3, 1.5) if rng.random() < 0.85 else rng.uniform(3, 10)
+        yield gap, field, f"value {i}"
+
+def main():
+    writes = []
+
+    def save(draft_key, payload):
+        if os.environ.get("DATABASE_URL"):
+            from db import save_draft_changes
+            save_draft_changes(draft_key, payload)
+        writes.append(len(payload))
+
+    writer = DraftWriter(save=save, interval=5 / SPEEDUP, idle=2 / SPEEDUP)
+    snapshot = draft_defaults()
+    naive_bytes = 0
+    simulated = 0.0
+    for gap, field, value in edit_session():
+        time.sleep(gap / SPEEDUP)
+        simulated += gap
+        snapshot[field] = value
+        naive_bytes += len(json.dumps(snapshot))
+        writer.queue("bench-draft", {field: value})
+    time.sleep(3 / SPEEDUP)
+    writer.flush_all()
+
+    print(f"{EDITS} edits over {simulated / 60:.1f} simulated minutes")
+    print(f"  write per rerun (full form):  writes={EDITS:5d}  bytes={naive_bytes:8d}")
+    print(f"  debounced deltas:             writes={len(writes):5d}  bytes={sum(writes):8d}")
+    print(f"  write amplification: {len(writes) / EDITS:.3f} writes/edit, {sum(writes) / naive_bytes:.3f} of naive bytes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import os
+import random
+import sys
+import time
+from bisect import bisect_right
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from fx import RateTable, as_days
+
+ROWS = int(os.environ.get("BENCH_ROWS", 1_000_000))
+START = date(2020, 1, 1)
+DAYS = 5 * 365
+CURRENCIES = ["USD", "GBP", "EUR", "JPY", "CHF", "CAD"]
+
+def synthetic_rates(rng):
+    rates = []
+    for currency in CURRENCIES[1:]:
+        rate = {"GBP": 0.8, "EUR": 0.9, "JPY": 140.0, "CHF": 0.9, "CAD": 1.35}[currency]
+        for day in range(DAYS):
+            rate_date = START + timedelta(days=day)
+            if rate_date.weekday() < 5:
+                rate *= 1 + rng.gauss(0, 0.004)
+                rates.append((rate_date, currency, rate))
+    return rates
+
+# The straightforward version: one bisect over the published dates per row,
+# on each side of the pair.
+def convert_per_row(rates, amounts, currencies, dates, to_currency):
+    by_currency = {}
+    for rate_date, currency, rate in rates:
+        by_currency.setdefault(currency, ([], []))
+        by_currency[currency][0].append(rate_date)
+        by_currency[currency][1].append(rate)
+
+    def rate(currency, on):
+        if currency == "USD":
+            return 1.0
+        days, values = by_currency[currency]
+        position = bisect_right(days, on) - 1
+        return values[position] if position >= 0 else float("nan")
+
+    return [amount / rate(currency, on) * rate(to_currency, on) for amount, currency, on in zip(amounts, currencies, dates)]
+
+def main():
+    rng = random.Random(5)
+    rates = synthetic_rates(rng)
+    table = RateTable(rates, base="USD")
+    dates = [START + timedelta(days=rng.randrange(DAYS)) for _ in range(ROWS)]
+    currencies = [rng.choice(CURRENCIES) for _ in range(ROWS)]
+    amounts = [round(rng.uniform(10, 5000), 2) for _ in range(ROWS)]
+
+    started = time.perf_counter()
+    vectorized = table.convert(amounts, currencies, dates, "GBP")
+    fast = time.perf_counter() - started
+
+    # The same call once the columns are already numpy arrays, i.e. the cost
+    # of the conversion itself without marshalling Python rows.
+    columns = (np.asarray(amounts), np.asarray(currencies), as_days(dates))
+    started = time.perf_counter()
+    table.convert(*columns, "GBP")
+    core = time.perf_counter() - started
+
+    started = time.perf_counter()
+    per_row = convert_per_row(rates, amounts, currencies, dates, "GBP")
+    slow = time.perf_counter() - started
+
+    worst = max(abs(a - b) for a, b in zip(vectorized.tolist(), per_row))
+    print(f"{ROWS} invoices in {len(CURRENCIES)} currencies -> GBP")
+    print(f"vectorized:  {fast:7.3f} s  ({core:.3f} s from arrays)")
+    print(f"per row:     {slow:7.3f} s")
+    print(f"max difference: {worst:.2e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import get_db_connection, init_db, save_invoice_history, save_invoice_history_batch
+from journal import InvoiceJournal
+
+INVOICES = int(os.environ.get("BENCH_INVOICES", 200))
+PDF_KB = int(os.environ.get("BENCH_PDF_KB", 40))
+PREFIX = "JOURNALBENCH-"
+
+def make_invoice(i):
+    return {
+        "invoice_number": f"{PREFIX}{i:06d}",
+        "invoice_date": date.today(),
+        "due_date": date.today() + timedelta(days=30),
+        "client_name": "Journal Bench",
+        "client_email": "journal-bench@example.com",
+        "client_address": "",
+        "your_name": "Bench",
+        "subtotal": 100.0,
+        "tax": 10.0,
+        "total": 110.0,
+        "currency": "USD",
+        "items": [{"description": "Work", "quantity": 1, "rate": 100.0, "amount": 100.0}],
+    }
+
+def report(label, samples):
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    print(f"{label:28} p50 {cuts[49] * 1000:7.2f} ms  p99 {cuts[98] * 1000:7.2f} ms")
+
+def cleanup():
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("DELETE FROM invoice_history WHERE invoice_number LIKE %s", (f"{PREFIX}%",))
+    cur.execute("DELETE FROM clients WHERE email_normalized = 'journal-bench@example.com'")
+    conn.commit()
+    conn.close()
+
+def main():
+    if not os.environ.get("DATABASE_URL"):
+        sys.exit("Set DATABASE_URL to a local Postgres; the benchmark writes and then removes its own invoices.")
+    init_db()
+    pdf = os.urandom(PDF_KB * 1024)
+    invoices = [make_invoice(i) for i in range(INVOICES)]
+
+    # What the Generate button used to wait for: one transaction per invoice.
+    direct = []
+    for invoice in invoices:
+        started = time.perf_counter()
+        save_invoice_history(invoice, pdf)
+        direct.append(time.perf_counter() - started)
+    cleanup()
+
+    directory = tempfile.mkdtemp(prefix="journal-bench-")
+    try:
+        journal = InvoiceJournal(directory)
+        appended = []
+        started_all = time.perf_counter()
+        for invoice in invoices:
+            started = time.perf_counter()
+            journal.append(invoice, pdf)
+            appended.append(time.perf_counter() - started)
+        journal.flush()
+        drained = time.perf_counter() - started_all
+        stats = dict(journal.stats)
+    finally:
+        shutil.rmtree(directory)
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*) FROM invoice_history WHERE invoice_number LIKE %s", (f"{PREFIX}%",))
+    stored = cur.fetchone()[0]
+    conn.close()
+    cleanup()
+
+    print(f"{INVOICES} invoices with {PDF_KB} KiB PDFs")
+    report("synchronous save", direct)
+    report("journal append (fsync)", appended)
+    print(f"journal drained to Postgres in {drained:.2f} s over {stats['flushes']} batches, {stored}/{INVOICES} rows stored")
+    print(f"total time in save: synchronous {sum(direct):.2f} s, journal {drained:.2f} s")
+
+    # Batched inserts on their own, without the journal in front.
+    for size in (1, 10, 100):
+        started = time.perf_counter()
+        for offset in range(0, INVOICES, size):
+            save_invoice_history_batch([(None, invoice, pdf) for invoice in invoices[offset:offset + size]])
+        print(f"batch size {size:3}: {(time.perf_counter() - started) / INVOICES * 1000:6.2f} ms per invoice")
+        cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import gc
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import psycopg2
+from streamlit.testing.v1 import AppTest
+
+USERS = int(os.environ.get("BENCH_USERS", 4))
+ITERATIONS = int(os.environ.get("BENCH_ITERATIONS", 3))
+# Allowed slowdown over the baseline before a metric counts as a regression.
+TOLERANCE = float(os.environ.get("BENCH_TOLERANCE", 0.3))
+BASELINE_FILE = os.environ.get("BENCH_BASELINE", os.path.join(ROOT, "benchmarks", "load_baseline.json"))
+UPDATE_BASELINE = os.environ.get("BENCH_UPDATE_BASELINE") == "1"
+APP = os.path.join(ROOT, "streamlit_app.py")
+PREFIX = "LOADTEST-"
+CLIENT_EMAIL = "loadtest@example.com"
+
+# Every connection the app opens goes through psycopg2.connect, whether from
+# the script or a background thread.
+connections = {"opened": 0}
+connections_lock = threading.Lock()
+real_connect = psycopg2.connect
+
+def counting_connect(*args, **kwargs):
+    with connections_lock:
+        connections["opened"] += 1
+    return real_connect(*args, **kwargs)
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return None
+
+def click(at, label):
+    next(b for b in at.button if b.label.startswith(label)).click()
+
+def navigate(at, page):
+    # The sidebar radio has no key, so its widget id only settles after a
+    # plain rerun; a real browser sends the same two requests.
+    at.run()
+    at.sidebar.radio[0].set_value(page)
+
+# The flow: open the app, fill in the form, generate the PDF, look at the
+# history, go back to Create. Each step is one rerun of the script.
+def run_flow(user, tag, timings, errors):
+    def timed(step, at):
+        started = time.perf_counter()
+        at.run()
+        timings.append((step, time.perf_counter() - started))
+        if at.exception:
+            errors.append((user, step, at.exception[0].value))
+
+    at = AppTest.from_file(APP, default_timeout=120)
+    timed("open", at)
+    for iteration in range(ITERATIONS):
+        at.text_input(key="invoice_number").set_value(f"{PREFIX}{user}-{tag}{iteration}")
+        at.text_input(key="client_name").set_value(f"Load Test {user}")
+        at.text_input(key="client_email").set_value(CLIENT_EMAIL)
+        timed("edit", at)
+        click(at, "Generate")
+        timed("generate", at)
+        navigate(at, "Invoice History")
+        timed("history", at)
+        navigate(at, "Create Invoice")
+        timed("create", at)
+    return at
+
+# AppTest swaps process-wide globals (the Runtime instance, page manager,
+# config) on every run, so sessions cannot share a process. Each simulated
+# user gets its own, and they start their measured flows together from a
+# barrier.
+def user_process(user, barrier, results):
+    psycopg2.connect = counting_connect
+    timings, errors, draft_keys = [], [], []
+
+    # Imports, st.cache_resource values and the schema check are paid once
+    # per server process, not per session, so one unmeasured pass through the
+    # whole flow comes first.
+    try:
+        warm = run_flow(user, "warm", [], errors)
+        draft_keys.append(warm.query_params.get("draft"))
+        del warm
+    except Exception as e:
+        errors.append((user, "warm-up", repr(e)))
+    gc.collect()
+
+    rss_before = rss_bytes()
+    opened_before = connections["opened"]
+    barrier.wait(timeout=600)
+    try:
+        at = run_flow(user, "", timings, errors)
+        draft_keys.append(at.query_params.get("draft"))
+    except Exception as e:
+        errors.append((user, "session", repr(e)))
+    gc.collect()
+    rss_after = rss_bytes()
+    opened = connections["opened"] - opened_before
+
+    from drafts import get_draft_writer
+    from journal import get_invoice_journal
+    get_draft_writer().flush_all()
+    get_invoice_journal().flush()
+    results.put({
+        "timings": timings,
+        "errors": errors,
+        "opened": opened,
+        "memory": rss_after - rss_before if rss_before else None,
+        "draft_keys": [k for k in draft_keys if k],
+    })
+
+def run_users(count):
+    # A journal of its own, so nothing is replayed into (or from) another
+    # database's invoices.
+    os.environ.setdefault("INVOICE_JOURNAL_DIR", tempfile.mkdtemp(prefix="loadtest-journal-"))
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(count + 1)
+    results = context.Queue()
+    processes = [context.Process(target=user_process, args=(user, barrier, results)) for user in range(count)]
+    for process in processes:
+        process.start()
+    barrier.wait(timeout=600)
+    started = time.perf_counter()
+    reports = [results.get(timeout=600) for _ in processes]
+    elapsed = time.perf_counter() - started
+    for process in processes:
+        process.join()
+    return reports, elapsed
+
+def percentiles(samples):
+    if len(samples) < 2:
+        value = samples[0] * 1000 if samples else 0
+        return value, value, value
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return cuts[49] * 1000, cuts[94] * 1000, cuts[98] * 1000
+
+def cleanup(draft_keys):
+    from db import get_db_connection
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("DELETE FROM invoice_history WHERE invoice_number LIKE %s", (f"{PREFIX}%",))
+    cur.execute("DELETE FROM invoice_drafts WHERE draft_key = ANY(%s)", (draft_keys,))
+    cur.execute("DELETE FROM clients WHERE email_normalized = %s AND NOT EXISTS (SELECT 1 FROM client_templates t WHERE t.client_id = clients.id)", (CLIENT_EMAIL,))
+    conn.commit()
+    conn.close()
+
+def compare(results, baseline):
+    regressions = []
+    for metric, value in results.items():
+        expected = baseline.get(metric)
+        if expected is None or value is None:
+            continue
+        if value > expected * (1 + TOLERANCE):
+            regressions.append(f"{metric}: {value:.2f} vs baseline {expected:.2f} (+{value / expected - 1:.0%})")
+    return regressions
+
+def main():
+    if not os.environ.get("DATABASE_URL"):
+        sys.exit("Set DATABASE_URL to a local Postgres; the test writes and then removes its own invoices.")
+
+    reports, elapsed = run_users(USERS)
+    timings = [timing for report in reports for timing in report["timings"]]
+    errors = [error for report in reports for error in report["errors"]]
+    opened = sum(report["opened"] for report in reports)
+    memory = [report["memory"] for report in reports if report["memory"] is not None]
+
+    reruns = [seconds for _, seconds in timings]
+    if not reruns:
+        sys.exit(f"no reruns completed: {errors}")
+    p50, p95, p99 = percentiles(reruns)
+    results = {
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99,
+        "connections_per_rerun": opened / len(reruns),
+        "memory_per_session_mb": statistics.median(memory) / 2**20 if memory else None,
+    }
+
+    print(f"{USERS} concurrent users x {ITERATIONS} flows: {len(reruns)} reruns in {elapsed:.1f} s")
+    for step in dict.fromkeys(step for step, _ in timings):
+        step_p50, step_p95, step_p99 = percentiles([seconds for name, seconds in timings if name == step])
+        print(f"  {step:9} p50 {step_p50:7.1f} ms  p95 {step_p95:7.1f} ms  p99 {step_p99:7.1f} ms")
+    print(f"  {'all':9} p50 {p50:7.1f} ms  p95 {p95:7.1f} ms  p99 {p99:7.1f} ms")
+    print(f"DB connections opened: {opened} ({results['connections_per_rerun']:.2f} per rerun)")
+    if results["memory_per_session_mb"] is not None:
+        print(f"memory per session:    {results['memory_per_session_mb']:.1f} MiB (median RSS growth over a session)")
+
+    cleanup([key for report in reports for key in report["draft_keys"]])
+    if errors:
+        for error in errors:
+            print("error:", *error)
+        sys.exit(1)
+
+    baselines = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as f:
+            baselines = json.load(f)
+    key = f"{USERS}x{ITERATIONS}"
+    if UPDATE_BASELINE:
+        baselines[key] = {metric: round(value, 2) for metric, value in results.items() if value is not None}
+        with open(BASELINE_FILE, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline {key} written to {BASELINE_FILE}")
+        return
+    if key not in baselines:
+        print(f"no baseline for {key}; run with BENCH_UPDATE_BASELINE=1 to record one")
+        return
+    regressions = compare(results, baselines[key])
+    if regressions:
+        print("REGRESSION against baseline", key)
+        for line in regressions:
+            print("  " + line)
+        sys.exit(1)
+    print(f"within {TOLERANCE:.0%} of baseline {key}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preview import PreviewRenderer, payload_hash
+
+SESSIONS = int(os.environ.get("BENCH_SESSIONS", 4))
+KEYSTROKES = int(os.environ.get("BENCH_KEYSTROKES", 40))
+# Gap between reruns while typing; Streamlit sends one per committed edit.
+TYPING_GAP = float(os.environ.get("BENCH_TYPING_GAP", 0.08))
+
+def make_invoice(session, text):
+    return {
+        "invoice_number": f"PREVIEW-{session}",
+        "invoice_date": date.today(),
+        "due_date": date.today() + timedelta(days=30),
+        "your_name": "Bench",
+        "your_email": "bench@example.com",
+        "your_address": "1 Bench Street",
+        "client_name": text,
+        "client_email": "client@example.com",
+        "client_address": "2 Client Road",
+        "currency": "EUR",
+        "items": [{"desc": f"Item {i}", "qty": i + 1, "rate": 120.0, "total": 120.0 * (i + 1)} for i in range(5)],
+        "subtotal": 1800.0,
+        "tax_rate": 20,
+        "tax": 360.0,
+        "total": 2160.0,
+        "notes": "Thank you",
+    }
+
+# One simulated tab: a burst of edits, then wait for the preview of the last
+# one, the way the page's polling fragment does.
+def type_and_wait(renderer, session, rng, request_times, ready_after):
+    text = ""
+    for _ in range(KEYSTROKES):
+        text += rng.choice("abcdefghij ")
+        started = time.perf_counter()
+        key = renderer.request(session, make_invoice(session, text))
+        request_times.append(time.perf_counter() - started)
+        time.sleep(TYPING_GAP * rng.uniform(0.5, 1.5))
+    last_edit = time.perf_counter()
+    while renderer.get(key) is None:
+        time.sleep(0.01)
+    ready_after.append(time.perf_counter() - last_edit)
+
+def main():
+    renderer = PreviewRenderer()
+    # The first render pays for imports and font loading.
+    key = renderer.request("warm", make_invoice("warm", "warm"))
+    while renderer.get(key) is None:
+        time.sleep(0.01)
+
+    request_times, ready_after = [], []
+    threads = [
+        threading.Thread(target=type_and_wait, args=(renderer, f"tab{i}", random.Random(i), request_times, ready_after))
+        for i in range(SESSIONS)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = renderer.stats
+    print(f"{SESSIONS} tabs typing {KEYSTROKES} edits each, ~{TYPING_GAP * 1000:.0f} ms apart")
+    print(f"request() on the rerun:   p50 {statistics.median(request_times) * 1000:.3f} ms  max {max(request_times) * 1000:.2f} ms")
+    print(f"preview after last edit:  p50 {statistics.median(ready_after) * 1000:.0f} ms  max {max(ready_after) * 1000:.0f} ms")
+    print(f"renders: {stats['renders'] - 1} for {stats['requests'] - 1} requests ({stats['superseded']} dropped as stale, {stats['failures']} failed)")
+
+    started = time.perf_counter()
+    for _ in range(1000):
+        renderer.request("tab0", make_invoice("tab0", "cached"))
+    hits = time.perf_counter() - started
+    print(f"cache hit on an unchanged form: {hits:.3f} ms per rerun (payload hash {payload_hash(make_invoice('tab0', 'cached'))[:12]}...)")
+
+if __name__ == "__main__":
+    main()
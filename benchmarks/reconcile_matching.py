@@ -0,0 +1,96 @@
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reconcile import InvoiceIndex, normalize_reference, reconcile, summarize, to_minor_units
+
+INVOICES = int(os.environ.get("BENCH_INVOICES", 1_000_000))
+TRANSACTIONS = int(os.environ.get("BENCH_TRANSACTIONS", 100_000))
+NAIVE_SAMPLE = 20
+CURRENCIES = ["USD", "USD", "USD", "GBP", "EUR"]
+
+def synthetic_invoices(rng):
+    for i in range(INVOICES):
+        client = i % 20000
+        yield (i + 1, f"INV-{2020 + i % 6}-{i:07d}", rng.choice(CURRENCIES),
+               Decimal(rng.randrange(1000, 500000)) / 100, client, f"Client {client} Ltd")
+
+# Bank memos as they tend to arrive: a clean reference, a mangled one, only the
+# payer's name, or nothing useful at all. Some payers settle only part of it.
+def synthetic_transactions(rng, invoices):
+    start = date(2025, 1, 1)
+    for n, (invoice_id, number, currency, outstanding, client, name) in enumerate(rng.sample(invoices, TRANSACTIONS)):
+        amount = outstanding if rng.random() < 0.9 else (outstanding / 2).quantize(Decimal("0.01"))
+        kind = rng.random()
+        if kind < 0.5:
+            memo = f"{name.upper()} PAYMENT {number.replace('-', ' ')}"
+        elif kind < 0.6:
+            memo = f"{name} ref {number[4:]}"
+        elif kind < 0.95:
+            memo = f"FASTER PAYMENT {name.upper()}"
+        else:
+            memo = "TRANSFER"
+        yield invoice_id, {
+            "fingerprint": str(n),
+            "source": "csv",
+            "payment_date": start + timedelta(days=n % 365),
+            "amount": amount,
+            "currency": currency,
+            "memo": memo,
+        }
+
+# What matching looks like without indexes: every payment scans every open
+# invoice for its number in the memo, then for an equal amount.
+def naive_match(txn, invoices):
+    memo = normalize_reference(txn["memo"])
+    for invoice in invoices:
+        if normalize_reference(invoice[1]) in memo:
+            return invoice[0]
+    for invoice in invoices:
+        if invoice[3] == txn["amount"] and invoice[2] == txn["currency"]:
+            return invoice[0]
+    return None
+
+# The shape db.iter_open_invoices returns, normalized on the database side.
+def open_invoice_rows(invoices):
+    return [
+        (invoice_id, normalize_reference(number), currency, to_minor_units(outstanding, currency), client, normalize_reference(name))
+        for invoice_id, number, currency, outstanding, client, name in invoices
+    ]
+
+def main():
+    rng = random.Random(11)
+    invoices = list(synthetic_invoices(rng))
+    expected, transactions = zip(*synthetic_transactions(rng, invoices))
+    rows = open_invoice_rows(invoices)
+
+    started = time.perf_counter()
+    index = InvoiceIndex(rows)
+    indexed = time.perf_counter() - started
+    started = time.perf_counter()
+    results = reconcile(transactions, index)
+    matched = time.perf_counter() - started
+
+    correct = sum(1 for want, r in zip(expected, results) if r["invoice_id"] == want)
+    wrong = sum(1 for want, r in zip(expected, results) if r["invoice_id"] not in (None, want))
+
+    started = time.perf_counter()
+    for txn in transactions[:NAIVE_SAMPLE]:
+        naive_match(txn, invoices)
+    naive = (time.perf_counter() - started) / NAIVE_SAMPLE * len(transactions)
+
+    print(f"{INVOICES} open invoices, {len(transactions)} bank lines")
+    print(f"index build:      {indexed:8.2f} s")
+    print(f"matching:         {matched:8.2f} s  ({len(transactions) / matched:,.0f} lines/s)")
+    print(f"nested loops:     {naive:8.0f} s  (extrapolated from {NAIVE_SAMPLE} lines)")
+    print(f"correct invoice:  {correct / len(results):8.1%}")
+    print(f"wrong invoice:    {wrong / len(results):8.1%}")
+    print(f"outcome:          {summarize(results)}")
+
+if __name__ == "__main__":
+    main()
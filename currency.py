@@ -0,0 +1,137 @@
+import os
+from decimal import ROUND_HALF_UP, Decimal
+
+CURRENCIES = {
+    "USD": {"symbol": "$", "name": "US Dollar", "position": "before", "decimals": 2},
+    "GBP": {"symbol": "£", "name": "British Pound", "position": "before", "decimals": 2},
+    "EUR": {"symbol": "€", "name": "Euro", "position": "before", "decimals": 2},
+    "CAD": {"symbol": "CA$", "name": "Canadian Dollar", "position": "before", "decimals": 2},
+    "AUD": {"symbol": "A$", "name": "Australian Dollar", "position": "before", "decimals": 2},
+    "CHF": {"symbol": "CHF ", "name": "Swiss Franc", "position": "before", "decimals": 2},
+    "JPY": {"symbol": "¥", "name": "Japanese Yen", "position": "before", "decimals": 0},
+    "CNY": {"symbol": "CN¥", "name": "Chinese Yuan", "position": "before", "decimals": 2},
+    "INR": {"symbol": "₹", "name": "Indian Rupee", "position": "before", "decimals": 2},
+    "KRW": {"symbol": "₩", "name": "South Korean Won", "position": "before", "decimals": 0},
+    "SEK": {"symbol": " kr", "name": "Swedish Krona", "position": "after", "decimals": 2},
+    "NOK": {"symbol": " kr", "name": "Norwegian Krone", "position": "after", "decimals": 2},
+    "DKK": {"symbol": " kr.", "name": "Danish Krone", "position": "after", "decimals": 2},
+    "KWD": {"symbol": "KD ", "name": "Kuwaiti Dinar", "position": "before", "decimals": 3},
+    "BHD": {"symbol": "BD ", "name": "Bahraini Dinar", "position": "before", "decimals": 3},
+}
+
+# Separators and symbol placement per locale. A locale without a "position"
+# keeps each currency's own placement and spacing; the others put the bare
+# symbol on the given side with a no-break space.
+LOCALES = {
+    "en_US": {"group": ",", "decimal": ".", "position": None},
+    "en_GB": {"group": ",", "decimal": ".", "position": None},
+    "de_CH": {"group": "\u2019", "decimal": ".", "position": None},
+    "de_DE": {"group": ".", "decimal": ",", "position": "after"},
+    "es_ES": {"group": ".", "decimal": ",", "position": "after"},
+    "it_IT": {"group": ".", "decimal": ",", "position": "after"},
+    "fr_FR": {"group": "\u00a0", "decimal": ",", "position": "after"},
+    "sv_SE": {"group": "\u00a0", "decimal": ",", "position": "after"},
+    "nl_NL": {"group": ".", "decimal": ",", "position": "before"},
+}
+
+def currency_decimals(currency_code):
+    return CURRENCIES.get(currency_code, CURRENCIES["USD"])["decimals"]
+
+# Amounts are rounded half up to the currency's minor unit as soon as they
+# are calculated, so the PDF, the stored row and reconciliation all agree.
+def round_amount(amount, currency_code):
+    return float(Decimal(str(amount)).quantize(Decimal(1).scaleb(-currency_decimals(currency_code)), ROUND_HALF_UP))
+
+CURRENCY_LOCALE = os.environ.get("CURRENCY_LOCALE", "en_US")
+
+class CurrencyFormatter:
+    def __init__(self, currency_code, locale):
+        curr = CURRENCIES.get(currency_code, CURRENCIES["USD"])
+        conventions = LOCALES.get(locale, LOCALES["en_US"])
+        position = conventions["position"]
+        if position is None:
+            position, symbol = curr["position"], curr["symbol"]
+        elif position == "before":
+            symbol = curr["symbol"].strip() + "\u00a0"
+        else:
+            symbol = "\u00a0" + curr["symbol"].strip()
+        self.prefix, self.suffix = (symbol, "") if position == "before" else ("", symbol)
+        self.group = conventions["group"]
+        self.decimal = conventions["decimal"]
+
+        # Format specs only group with "," or "_"; for other conventions the
+        # number is grouped with "_" and both separators are swapped after.
+        self.swap = (self.group, self.decimal) != (",", ".")
+        spec = f"{'_' if self.swap else ','}.{curr['decimals']}f"
+        self.number = f"{{:{spec}}}".format
+        self.positive = f"{self.prefix}{{:{spec}}}{self.suffix}".format
+        self.negative = f"-{self.prefix}{{:{spec}}}{self.suffix}".format
+        self.table = str.maketrans({"_": self.group, ".": self.decimal})
+
+    def __call__(self, amount):
+        if not self.swap:
+            return self.positive(amount) if amount >= 0 else self.negative(-amount)
+        # Decimal has no "_" grouping.
+        amount = float(amount)
+        number = self.number(abs(amount)).translate(self.table)
+        return f"{'-' if amount < 0 else ''}{self.prefix}{number}{self.suffix}"
+
+    # Formats a whole column at once. With en_US separators the templates
+    # already carry the symbol; otherwise the numbers are joined into one
+    # string so separators and symbols are applied by a few str.replace
+    # passes instead of per value.
+    def format_many(self, amounts):
+        values = amounts.tolist() if hasattr(amounts, "tolist") else list(map(float, amounts))
+        if not self.swap:
+            positive, negative = self.positive, self.negative
+            return [positive(value) if value >= 0 else negative(-value) for value in values]
+        if not values:
+            return []
+        text = "\n".join(map(self.number, values))
+        text = text.replace(".", self.decimal).replace("_", self.group)
+        if self.prefix or self.suffix:
+            text = self.prefix + text.replace("\n", f"{self.suffix}\n{self.prefix}") + self.suffix
+            if self.prefix and "-" in text:
+                text = text.replace(f"{self.prefix}-", f"-{self.prefix}")
+        return text.split("\n")
+
+formatters = {}
+# Formatters for CURRENCY_LOCALE by currency code alone, so the common call
+# with no locale costs one dict lookup.
+default_formatters = {}
+
+def get_formatter(currency_code, locale=None):
+    key = (currency_code, locale or CURRENCY_LOCALE)
+    formatter = formatters.get(key)
+    if formatter is None:
+        formatter = formatters[key] = CurrencyFormatter(*key)
+    return formatter
+
+def format_currency(amount, currency_code, locale=None):
+    if locale is not None:
+        return get_formatter(currency_code, locale)(amount)
+    formatter = default_formatters.get(currency_code)
+    if formatter is None:
+        formatter = default_formatters[currency_code] = get_formatter(currency_code).__call__
+    return formatter(amount)
+
+# currency_codes is one code for the whole column, or one per amount.
+def format_amounts(amounts, currency_codes, locale=None):
+    if isinstance(currency_codes, str):
+        return get_formatter(currency_codes, locale).format_many(amounts)
+    by_code = {code: get_formatter(code, locale) for code in set(currency_codes)}
+    if len(by_code) <= 1:
+        return get_formatter(next(iter(by_code), "USD"), locale).format_many(amounts)
+    if not any(formatter.swap for formatter in by_code.values()):
+        values = amounts.tolist() if hasattr(amounts, "tolist") else list(map(float, amounts))
+        positive = {code: formatter.positive for code, formatter in by_code.items()}
+        negative = {code: formatter.negative for code, formatter in by_code.items()}
+        return [positive[code](value) if value >= 0 else negative[code](-value) for value, code in zip(values, currency_codes)]
+    positions = {}
+    for i, code in enumerate(currency_codes):
+        positions.setdefault(code, []).append(i)
+    formatted = [None] * len(currency_codes)
+    for code, indexes in positions.items():
+        for i, text in zip(indexes, by_code[code].format_many([amounts[i] for i in indexes])):
+            formatted[i] = text
+    return formatted
@@ -0,0 +1,644 @@
+import os
+import json
+import threading
+import time
+import psycopg2
+from psycopg2.extras import RealDictCursor, execute_values
+
+from currency import CURRENCIES
+
+DATABASE_REPLICA_URL = os.environ.get("DATABASE_REPLICA_URL")
+REPLICA_MAX_LAG_SECONDS = float(os.environ.get("REPLICA_MAX_LAG_SECONDS", 5))
+REPLICA_CONNECT_TIMEOUT = int(os.environ.get("REPLICA_CONNECT_TIMEOUT", 2))
+REPLICA_RETRY_SECONDS = float(os.environ.get("REPLICA_RETRY_SECONDS", 30))
+
+# Highest WAL position this process has committed. Reads only go to the
+# replica once it has replayed past it, so a page never reads back a state
+# from before a save made a moment earlier. It is per process, not per user:
+# after anyone's write, everyone waits for the replica to catch up.
+last_write_lsn = 0
+# After the replica fails to connect or answer, reads skip it until then
+# instead of each waiting out REPLICA_CONNECT_TIMEOUT.
+replica_retry_at = 0
+routing_lock = threading.Lock()
+read_stats = {"replica": 0, "primary": 0, "lagging": 0, "unavailable": 0}
+
+def get_db_connection():
+    return psycopg2.connect(os.environ.get("DATABASE_URL"))
+
+def parse_lsn(text):
+    high, low = text.split("/")
+    return (int(high, 16) << 32) | int(low, 16)
+
+def format_lsn(value):
+    return f"{value >> 32:X}/{value & 0xFFFFFFFF:X}"
+
+def remember_write(cur):
+    global last_write_lsn
+    if not DATABASE_REPLICA_URL:
+        return
+    cur.execute("SELECT pg_current_wal_lsn()::text")
+    lsn = parse_lsn(cur.fetchone()[0])
+    with routing_lock:
+        last_write_lsn = max(last_write_lsn, lsn)
+
+def count_read(route):
+    with routing_lock:
+        read_stats[route] += 1
+
+# Read-only queries for the History, Templates and reporting views. The replica
+# is used when it has replayed this process's last write and is not further
+# behind than REPLICA_MAX_LAG_SECONDS; otherwise, or when it cannot be reached,
+# the read goes to the primary. last_write_lsn is per process, so a write made
+# by another server process may not be visible yet. A replica that has replayed
+# everything it received counts as no lag only while its WAL receiver is
+# streaming; a disconnected one may be missing any amount of WAL. Without
+# pg_read_all_stats the app role sees the receiver's row but not its status,
+# so a running receiver is all that can be checked; grant it for the exact
+# test. Pointing DATABASE_REPLICA_URL at a primary is harmless.
+def get_read_connection():
+    global replica_retry_at
+    if not DATABASE_REPLICA_URL:
+        count_read("primary")
+        return get_db_connection()
+    if time.monotonic() < replica_retry_at:
+        count_read("unavailable")
+        return get_db_connection()
+    conn = None
+    try:
+        conn = psycopg2.connect(DATABASE_REPLICA_URL, connect_timeout=REPLICA_CONNECT_TIMEOUT)
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT
+                COALESCE(pg_last_wal_replay_lsn() >= %s::pg_lsn, TRUE),
+                CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+                        AND EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming' OR status IS NULL) THEN 0
+                    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+                END
+        """, (format_lsn(last_write_lsn),))
+        caught_up, lag = cur.fetchone()
+        cur.close()
+    except psycopg2.Error:
+        if conn is not None:
+            conn.close()
+        with routing_lock:
+            replica_retry_at = time.monotonic() + REPLICA_RETRY_SECONDS
+        count_read("unavailable")
+        return get_db_connection()
+    if caught_up and lag <= REPLICA_MAX_LAG_SECONDS:
+        count_read("replica")
+        return conn
+    conn.close()
+    count_read("lagging")
+    return get_db_connection()
+
+def init_db():
+    conn = get_db_connection()
+    cur = conn.cursor()
+    # CREATE ... IF NOT EXISTS is not safe against itself: two processes
+    # starting on a fresh database can both try to create the same table.
+    # The lock is released when this transaction commits.
+    cur.execute("SELECT pg_advisory_xact_lock(hashtext('invoice_ninja.init_db'))")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS client_templates (
+            id SERIAL PRIMARY KEY,
+            template_name VARCHAR(255) NOT NULL,
+            client_name VARCHAR(255),
+            client_email VARCHAR(255),
+            client_address TEXT,
+            your_name VARCHAR(255),
+            your_email VARCHAR(255),
+            your_address TEXT,
+            currency VARCHAR(10) DEFAULT 'USD',
+            tax_rate INTEGER DEFAULT 0,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS invoice_history (
+            id SERIAL PRIMARY KEY,
+            invoice_number VARCHAR(100) NOT NULL,
+            invoice_date DATE,
+            due_date DATE,
+            client_name VARCHAR(255),
+            client_email VARCHAR(255),
+            your_name VARCHAR(255),
+            subtotal DECIMAL(13, 3),
+            tax DECIMAL(13, 3),
+            total DECIMAL(13, 3),
+            currency VARCHAR(10) DEFAULT 'USD',
+            items_json TEXT,
+            pdf_data BYTEA,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS user_settings (
+            id SERIAL PRIMARY KEY,
+            logo_data BYTEA,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("ALTER TABLE user_settings ADD COLUMN IF NOT EXISTS logo_preview BYTEA")
+    cur.execute("ALTER TABLE user_settings ADD COLUMN IF NOT EXISTS logo_hash VARCHAR(64)")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS invoice_drafts (
+            id SERIAL PRIMARY KEY,
+            draft_key VARCHAR(64) NOT NULL UNIQUE,
+            payload JSONB NOT NULL DEFAULT '{}',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("DELETE FROM invoice_drafts WHERE updated_at < CURRENT_TIMESTAMP - INTERVAL '30 days'")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS clients (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(255),
+            email VARCHAR(255),
+            email_normalized VARCHAR(255) NOT NULL UNIQUE,
+            address TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("ALTER TABLE invoice_history ADD COLUMN IF NOT EXISTS client_id INTEGER REFERENCES clients(id)")
+    cur.execute("ALTER TABLE client_templates ADD COLUMN IF NOT EXISTS client_id INTEGER REFERENCES clients(id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS invoice_history_client_date_idx ON invoice_history (client_id, invoice_date)")
+    cur.execute("CREATE INDEX IF NOT EXISTS client_templates_client_idx ON client_templates (client_id)")
+    # One-off data migrations record themselves here so later starts skip
+    # them; the marker commits with the migration or not at all.
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            name VARCHAR(100) PRIMARY KEY,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("INSERT INTO schema_migrations (name) VALUES ('backfill_clients') ON CONFLICT DO NOTHING RETURNING name")
+    if cur.fetchone():
+        backfill_clients(cur)
+    cur.execute("ALTER TABLE invoice_history ADD COLUMN IF NOT EXISTS journal_id VARCHAR(32)")
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS invoice_history_journal_idx ON invoice_history (journal_id)")
+    cur.execute("ALTER TABLE invoice_history ADD COLUMN IF NOT EXISTS amount_paid DECIMAL(13, 3) NOT NULL DEFAULT 0")
+    cur.execute("CREATE INDEX IF NOT EXISTS invoice_history_open_idx ON invoice_history (due_date, id) WHERE amount_paid < total")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS payments (
+            id SERIAL PRIMARY KEY,
+            fingerprint VARCHAR(64) NOT NULL UNIQUE,
+            source VARCHAR(10),
+            payment_date DATE NOT NULL,
+            amount DECIMAL(13, 3) NOT NULL,
+            currency VARCHAR(10),
+            memo TEXT,
+            invoice_id INTEGER REFERENCES invoice_history(id),
+            client_id INTEGER REFERENCES clients(id),
+            match_method VARCHAR(20),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS payments_client_date_idx ON payments (client_id, payment_date)")
+    cur.execute("CREATE INDEX IF NOT EXISTS payments_invoice_idx ON payments (invoice_id)")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS fx_rates (
+            rate_date DATE NOT NULL,
+            currency VARCHAR(10) NOT NULL,
+            rate DECIMAL(18, 8) NOT NULL,
+            PRIMARY KEY (currency, rate_date)
+        )
+    """)
+    # Dropped rather than replaced: adding the payments arm changes the
+    # column types, which CREATE OR REPLACE VIEW refuses to do. It also has to
+    # be gone before the amount columns below can change type.
+    cur.execute("DROP VIEW IF EXISTS client_ledger")
+    # Amounts used to be stored to the cent; KWD and BHD need a third decimal.
+    cur.execute("""
+        SELECT numeric_scale FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name = 'invoice_history' AND column_name = 'total'
+    """)
+    if cur.fetchone()[0] < 3:
+        cur.execute("""
+            ALTER TABLE invoice_history
+                ALTER COLUMN subtotal TYPE DECIMAL(13, 3),
+                ALTER COLUMN tax TYPE DECIMAL(13, 3),
+                ALTER COLUMN total TYPE DECIMAL(13, 3),
+                ALTER COLUMN amount_paid TYPE DECIMAL(13, 3)
+        """)
+        cur.execute("ALTER TABLE payments ALTER COLUMN amount TYPE DECIMAL(13, 3)")
+    cur.execute("""
+        CREATE VIEW client_ledger AS
+        SELECT
+            e.*,
+            SUM(e.amount) OVER (
+                PARTITION BY e.client_id, e.currency
+                ORDER BY e.entry_date, e.entry_type, e.entry_id
+                ROWS UNBOUNDED PRECEDING
+            ) AS running_balance
+        FROM (
+            SELECT h.client_id, h.invoice_date AS entry_date, 'invoice' AS entry_type,
+                h.id AS entry_id, h.invoice_number AS reference, h.currency, h.total AS amount
+            FROM invoice_history h
+            WHERE h.client_id IS NOT NULL
+            UNION ALL
+            SELECT p.client_id, p.payment_date, 'payment', p.id, p.memo, p.currency, -p.amount
+            FROM payments p
+            WHERE p.client_id IS NOT NULL
+        ) e
+    """)
+    conn.commit()
+    cur.close()
+    conn.close()
+
+# Rows written before the clients table existed carry the client only as free
+# text. One client is created per normalized email, preferring the most recent
+# template (which has an address) over invoice rows. Rows without an email stay
+# unlinked. Runs once; every later write links its own client.
+def backfill_clients(cur):
+    cur.execute("""
+        INSERT INTO clients (name, email, email_normalized, address)
+        SELECT DISTINCT ON (email_normalized) name, email, email_normalized, address
+        FROM (
+            SELECT client_name AS name, BTRIM(client_email) AS email, LOWER(BTRIM(client_email)) AS email_normalized,
+                client_address AS address, created_at
+            FROM client_templates WHERE client_id IS NULL
+            UNION ALL
+            SELECT client_name, BTRIM(client_email), LOWER(BTRIM(client_email)), NULL, created_at
+            FROM invoice_history WHERE client_id IS NULL
+        ) src
+        WHERE email_normalized <> ''
+        ORDER BY email_normalized, address IS NULL, created_at DESC
+        ON CONFLICT (email_normalized) DO NOTHING
+    """)
+    cur.execute("""
+        UPDATE client_templates t SET client_id = c.id
+        FROM clients c
+        WHERE t.client_id IS NULL AND LOWER(BTRIM(t.client_email)) = c.email_normalized
+    """)
+    cur.execute("""
+        UPDATE invoice_history h SET client_id = c.id
+        FROM clients c
+        WHERE h.client_id IS NULL AND LOWER(BTRIM(h.client_email)) = c.email_normalized
+    """)
+
+def upsert_client(cur, name, email, address=None):
+    if not email or not email.strip():
+        return None
+    cur.execute("""
+        INSERT INTO clients (name, email, email_normalized, address)
+        VALUES (%s, BTRIM(%s), LOWER(BTRIM(%s)), %s)
+        ON CONFLICT (email_normalized) DO UPDATE
+        SET name = EXCLUDED.name, email = EXCLUDED.email, address = COALESCE(EXCLUDED.address, clients.address)
+        RETURNING id
+    """, (name, email, email, address))
+    return cur.fetchone()[0]
+
+def save_template(template_data):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    client_id = upsert_client(cur, template_data["client_name"], template_data["client_email"], template_data["client_address"])
+    cur.execute("""
+        INSERT INTO client_templates (template_name, client_name, client_email, client_address,
+            your_name, your_email, your_address, currency, tax_rate, notes, client_id)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        RETURNING id
+    """, (
+        template_data["template_name"],
+        template_data["client_name"],
+        template_data["client_email"],
+        template_data["client_address"],
+        template_data["your_name"],
+        template_data["your_email"],
+        template_data["your_address"],
+        template_data["currency"],
+        template_data["tax_rate"],
+        template_data["notes"],
+        client_id
+    ))
+    template_id = cur.fetchone()[0]
+    conn.commit()
+    remember_write(cur)
+    cur.close()
+    conn.close()
+    return template_id
+
+def get_templates():
+    conn = get_read_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute("SELECT * FROM client_templates ORDER BY created_at DESC")
+    templates = cur.fetchall()
+    cur.close()
+    conn.close()
+    return templates
+
+def delete_template(template_id):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("DELETE FROM client_templates WHERE id = %s", (template_id,))
+    conn.commit()
+    remember_write(cur)
+    cur.close()
+    conn.close()
+
+def save_invoice_history(invoice_data, pdf_bytes):
+    save_invoice_history_batch([(None, invoice_data, pdf_bytes)])
+
+# Column widths of the free-text invoice_history fields, checked before an
+# invoice is accepted so the background write cannot fail on them later.
+INVOICE_FIELD_LIMITS = {"invoice_number": 100, "client_name": 255, "client_email": 255, "your_name": 255}
+
+def invoice_field_errors(invoice_data):
+    return [
+        f"{field.replace('_', ' ').capitalize()} is longer than {limit} characters"
+        for field, limit in INVOICE_FIELD_LIMITS.items()
+        if len(invoice_data.get(field) or "") > limit
+    ]
+
+# Takes (journal_id, invoice_data, pdf_bytes) tuples and writes them in one
+# transaction with a single multi-row INSERT. journal_id is unique, so a batch
+# replayed after a crash skips whatever was already committed.
+def save_invoice_history_batch(records):
+    conn = get_db_connection()
+    try:
+        cur = conn.cursor()
+        client_ids = {}
+        rows = []
+        for journal_id, invoice_data, pdf_bytes in records:
+            client_key = (invoice_data["client_email"] or "").strip().lower()
+            if client_key not in client_ids:
+                client_ids[client_key] = upsert_client(cur, invoice_data["client_name"], invoice_data["client_email"], invoice_data.get("client_address"))
+            rows.append((
+                invoice_data["invoice_number"],
+                invoice_data["invoice_date"],
+                invoice_data["due_date"],
+                invoice_data["client_name"],
+                invoice_data["client_email"],
+                invoice_data["your_name"],
+                invoice_data["subtotal"],
+                invoice_data["tax"],
+                invoice_data["total"],
+                invoice_data["currency"],
+                json.dumps(invoice_data["items"]),
+                pdf_bytes,
+                client_ids[client_key],
+                journal_id
+            ))
+        execute_values(cur, """
+            INSERT INTO invoice_history (invoice_number, invoice_date, due_date, client_name,
+                client_email, your_name, subtotal, tax, total, currency, items_json, pdf_data, client_id, journal_id)
+            VALUES %s
+            ON CONFLICT (journal_id) DO NOTHING
+        """, rows, page_size=100)
+        conn.commit()
+        remember_write(cur)
+        cur.close()
+    finally:
+        conn.close()
+
+def get_invoice_history(search_query=None, date_filter=None, client_id=None):
+    conn = get_read_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    query = "SELECT id, invoice_number, invoice_date, due_date, client_name, client_email, your_name, subtotal, tax, total, amount_paid, currency, client_id, created_at FROM invoice_history WHERE 1=1"
+    params = []
+    
+    if client_id:
+        query += " AND client_id = %s"
+        params.append(client_id)
+    
+    if search_query:
+        query += " AND (invoice_number ILIKE %s OR client_name ILIKE %s OR client_email ILIKE %s)"
+        search_param = f"%{search_query}%"
+        params.extend([search_param, search_param, search_param])
+    
+    if date_filter:
+        query += " AND invoice_date >= %s"
+        params.append(date_filter)
+    
+    query += " ORDER BY created_at DESC"
+    cur.execute(query, params)
+    history = cur.fetchall()
+    cur.close()
+    conn.close()
+    return history
+
+def get_clients():
+    conn = get_read_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute("SELECT id, name, email, address FROM clients ORDER BY name, email")
+    clients = cur.fetchall()
+    cur.close()
+    conn.close()
+    return clients
+
+def get_client_ledger(client_id):
+    conn = get_read_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute("""
+        SELECT entry_date, entry_type, reference, currency, amount, running_balance
+        FROM client_ledger
+        WHERE client_id = %s
+        ORDER BY currency, entry_date, entry_type, entry_id
+    """, (client_id,))
+    ledger = cur.fetchall()
+    cur.close()
+    conn.close()
+    return ledger
+
+# Named cursors are server-side: rows arrive in batches of itersize instead of
+# the whole result set being pulled into memory at execute() time.
+def iter_client_invoices(client_id, currency, start_date, end_date, itersize=2000):
+    conn = get_read_connection()
+    try:
+        cur = conn.cursor(name="client_statement")
+        cur.itersize = itersize
+        cur.execute("""
+            SELECT invoice_date, invoice_number, due_date, total
+            FROM invoice_history
+            WHERE client_id = %s AND currency = %s AND invoice_date BETWEEN %s AND %s
+            ORDER BY invoice_date, id
+        """, (client_id, currency, start_date, end_date))
+        yield from cur
+        cur.close()
+    finally:
+        conn.close()
+
+def get_client_aging(client_id, currency, start_date, end_date, as_of):
+    conn = get_read_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute("""
+        SELECT
+            COUNT(*) AS invoice_count,
+            COALESCE(SUM(total), 0) AS total,
+            COALESCE(SUM(total - amount_paid), 0) AS outstanding,
+            COALESCE(SUM(total - amount_paid) FILTER (WHERE due_date IS NULL OR due_date >= %(as_of)s), 0) AS current,
+            COALESCE(SUM(total - amount_paid) FILTER (WHERE %(as_of)s - due_date BETWEEN 1 AND 30), 0) AS days_1_30,
+            COALESCE(SUM(total - amount_paid) FILTER (WHERE %(as_of)s - due_date BETWEEN 31 AND 60), 0) AS days_31_60,
+            COALESCE(SUM(total - amount_paid) FILTER (WHERE %(as_of)s - due_date BETWEEN 61 AND 90), 0) AS days_61_90,
+            COALESCE(SUM(total - amount_paid) FILTER (WHERE %(as_of)s - due_date > 90), 0) AS days_over_90
+        FROM invoice_history
+        WHERE client_id = %(client_id)s AND currency = %(currency)s
+            AND invoice_date BETWEEN %(start_date)s AND %(end_date)s
+    """, {"client_id": client_id, "currency": currency, "start_date": start_date, "end_date": end_date, "as_of": as_of})
+    aging = cur.fetchone()
+    cur.close()
+    conn.close()
+    return aging
+
+# Oldest due date first, so amount-only matches settle the invoice that has
+# been outstanding longest. References and client names come back already
+# normalized (as reconcile.normalize_reference does) and amounts in each
+# currency's minor unit, so the matcher can index rows as they arrive.
+def iter_open_invoices(itersize=10000):
+    conn = get_db_connection()
+    try:
+        cur = conn.cursor(name="open_invoices")
+        cur.itersize = itersize
+        cur.execute("""
+            SELECT
+                id,
+                UPPER(REGEXP_REPLACE(invoice_number, '[^A-Za-z0-9]+', '', 'g')),
+                currency,
+                ROUND((total - amount_paid) * POWER(10::numeric, COALESCE((%s::jsonb ->> currency)::int, 2)))::BIGINT,
+                client_id,
+                UPPER(REGEXP_REPLACE(COALESCE(client_name, ''), '[^A-Za-z0-9]+', '', 'g'))
+            FROM invoice_history
+            WHERE amount_paid < total
+            ORDER BY due_date, id
+        """, (json.dumps({code: currency["decimals"] for code, currency in CURRENCIES.items()}),))
+        yield from cur
+        cur.close()
+    finally:
+        conn.close()
+
+def get_known_payment_fingerprints(fingerprints):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT fingerprint FROM payments WHERE fingerprint = ANY(%s)", (list(fingerprints),))
+    known = {row[0] for row in cur.fetchall()}
+    cur.close()
+    conn.close()
+    return known
+
+# One transaction for the whole import: payment rows and the amount_paid
+# increments go in as multi-row statements rather than one round trip each.
+def save_payments(payments):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    inserted = execute_values(cur, """
+        INSERT INTO payments (fingerprint, source, payment_date, amount, currency, memo, invoice_id, client_id, match_method)
+        VALUES %s
+        ON CONFLICT (fingerprint) DO NOTHING
+        RETURNING invoice_id, amount
+    """, [
+        (p["fingerprint"], p["source"], p["payment_date"], p["amount"], p["currency"],
+         p["memo"], p["invoice_id"], p["client_id"], p["match_method"])
+        for p in payments
+    ], page_size=1000, fetch=True)
+    applied = {}
+    for invoice_id, amount in inserted:
+        if invoice_id is not None:
+            applied[invoice_id] = applied.get(invoice_id, 0) + amount
+    execute_values(cur, """
+        UPDATE invoice_history h
+        SET amount_paid = h.amount_paid + v.amount
+        FROM (VALUES %s) AS v (id, amount)
+        WHERE h.id = v.id
+    """, list(applied.items()), template="(%s, %s::numeric)", page_size=1000)
+    conn.commit()
+    remember_write(cur)
+    cur.close()
+    conn.close()
+    return len(inserted)
+
+def get_invoice_pdf(invoice_id):
+    conn = get_read_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT pdf_data, invoice_number FROM invoice_history WHERE id = %s", (invoice_id,))
+    result = cur.fetchone()
+    cur.close()
+    conn.close()
+    return result
+
+def save_logo(logo_bytes, preview_bytes=None, logo_hash=None):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("DELETE FROM user_settings")
+    cur.execute("INSERT INTO user_settings (logo_data, logo_preview, logo_hash) VALUES (%s, %s, %s)",
+                (logo_bytes, preview_bytes, logo_hash))
+    conn.commit()
+    cur.close()
+    conn.close()
+
+LOGO_VARIANTS = {
+    "pdf": "logo_data",
+    "preview": "COALESCE(logo_preview, logo_data)",
+}
+
+def get_logo(variant="pdf"):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(f"SELECT {LOGO_VARIANTS[variant]} FROM user_settings ORDER BY id DESC LIMIT 1")
+    result = cur.fetchone()
+    cur.close()
+    conn.close()
+    return result[0] if result else None
+
+def get_logo_hash():
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT logo_hash FROM user_settings ORDER BY id DESC LIMIT 1")
+    result = cur.fetchone()
+    cur.close()
+    conn.close()
+    return result[0] if result else None
+
+def delete_logo():
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("DELETE FROM user_settings")
+    conn.commit()
+    cur.close()
+    conn.close()
+
+def save_draft_changes(draft_key, changes_json):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("""
+        INSERT INTO invoice_drafts (draft_key, payload)
+        VALUES (%s, %s::jsonb)
+        ON CONFLICT (draft_key) DO UPDATE
+        SET payload = invoice_drafts.payload || EXCLUDED.payload, updated_at = CURRENT_TIMESTAMP
+    """, (draft_key, changes_json))
+    conn.commit()
+    cur.close()
+    conn.close()
+
+def get_draft(draft_key):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT payload FROM invoice_drafts WHERE draft_key = %s", (draft_key,))
+    result = cur.fetchone()
+    cur.close()
+    conn.close()
+    return result[0] if result else None
+
+def get_fx_rates():
+    conn = get_read_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT rate_date, currency, rate FROM fx_rates ORDER BY currency, rate_date")
+    rates = cur.fetchall()
+    cur.close()
+    conn.close()
+    return rates
+
+def save_fx_rates(rates):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    execute_values(cur, """
+        INSERT INTO fx_rates (rate_date, currency, rate)
+        VALUES %s
+        ON CONFLICT (currency, rate_date) DO UPDATE SET rate = EXCLUDED.rate
+    """, rates, page_size=1000)
+    conn.commit()
+    remember_write(cur)
+    cur.close()
+    conn.close()
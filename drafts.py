@@ -0,0 +1,120 @@
+import json
+import os
+import threading
+import time
+import uuid
+import streamlit as st
+from datetime import date
+
+from db import save_draft_changes, get_draft
+from forms import FORM_DEFAULTS, invoice_defaults
+
+# A draft is written at most once per DRAFT_SAVE_INTERVAL seconds while the
+# user keeps editing, or DRAFT_IDLE_SECONDS after the last edit, whichever
+# comes first.
+DRAFT_SAVE_INTERVAL = float(os.environ.get("DRAFT_SAVE_INTERVAL", 5))
+DRAFT_IDLE_SECONDS = float(os.environ.get("DRAFT_IDLE_SECONDS", 2))
+
+DATE_FIELDS = {"invoice_date", "due_date"}
+
+def encode_field(value):
+    return value.isoformat() if isinstance(value, date) else value
+
+def decode_field(field, value):
+    return date.fromisoformat(value) if field in DATE_FIELDS else value
+
+class DraftWriter:
+    def __init__(self, save=save_draft_changes, interval=DRAFT_SAVE_INTERVAL, idle=DRAFT_IDLE_SECONDS):
+        self.save = save
+        self.interval = interval
+        self.idle = idle
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.first_pending_at = {}
+        self.timers = {}
+        self.stats = {"changes": 0, "writes": 0, "bytes": 0, "failures": 0}
+
+    def queue(self, draft_key, changes):
+        now = time.monotonic()
+        with self.lock:
+            self.pending.setdefault(draft_key, {}).update(changes)
+            self.stats["changes"] += len(changes)
+            first = self.first_pending_at.setdefault(draft_key, now)
+            fire_at = min(now + self.idle, first + self.interval)
+            self._schedule(draft_key, max(0, fire_at - now))
+
+    def _schedule(self, draft_key, delay):
+        timer = self.timers.pop(draft_key, None)
+        if timer:
+            timer.cancel()
+        timer = threading.Timer(delay, self.flush, args=(draft_key,))
+        timer.daemon = True
+        self.timers[draft_key] = timer
+        timer.start()
+
+    def flush(self, draft_key):
+        with self.lock:
+            changes = self.pending.pop(draft_key, None)
+            self.first_pending_at.pop(draft_key, None)
+            self.timers.pop(draft_key, None)
+        if not changes:
+            return
+        payload = json.dumps(changes, separators=(",", ":"))
+        try:
+            self.save(draft_key, payload)
+        except Exception:
+            # Put the changes back underneath anything queued in the meantime
+            # and try again on the next interval.
+            with self.lock:
+                self.stats["failures"] += 1
+                self.pending[draft_key] = {**changes, **self.pending.get(draft_key, {})}
+                self.first_pending_at.setdefault(draft_key, time.monotonic())
+                self._schedule(draft_key, self.interval)
+            return
+        with self.lock:
+            self.stats["writes"] += 1
+            self.stats["bytes"] += len(payload)
+
+    def flush_all(self):
+        with self.lock:
+            draft_keys = list(self.pending)
+        for draft_key in draft_keys:
+            self.flush(draft_key)
+
+@st.cache_resource
+def get_draft_writer():
+    return DraftWriter()
+
+# The draft key lives in the URL so a browser refresh finds the same draft.
+def draft_key():
+    key = st.query_params.get("draft")
+    if not key:
+        key = uuid.uuid4().hex
+        st.query_params["draft"] = key
+    return key
+
+def draft_defaults():
+    return {field: encode_field(value) for field, value in {**FORM_DEFAULTS, **invoice_defaults()}.items()}
+
+# Must run before init_form_defaults(). The snapshot is loaded from the
+# database once per session and re-applied whenever Streamlit has dropped the
+# widget state, e.g. after visiting another page.
+def restore_draft():
+    if "draft_snapshot" not in st.session_state:
+        snapshot = draft_defaults()
+        snapshot.update(get_draft(draft_key()) or {})
+        st.session_state.draft_snapshot = snapshot
+    for field, value in st.session_state.draft_snapshot.items():
+        if field not in st.session_state:
+            st.session_state[field] = decode_field(field, value)
+
+def autosave_draft():
+    snapshot = st.session_state.draft_snapshot
+    changes = {}
+    for field in snapshot:
+        value = encode_field(st.session_state.get(field))
+        if snapshot[field] != value:
+            changes[field] = value
+    if changes:
+        snapshot.update(changes)
+        get_draft_writer().queue(draft_key(), changes)
@@ -0,0 +1,52 @@
+import streamlit as st
+from datetime import date, timedelta
+
+from currency import CURRENCIES
+
+LINE_ITEM_COUNT = 5
+
+FORM_DEFAULTS = {
+    "your_name": "Alex Rivers",
+    "your_email": "alex@yourcompany.com",
+    "your_address": "123 Main St\nLos Angeles, CA 90001",
+    "client_name": "Acme Corp",
+    "client_email": "billing@acme.com",
+    "client_address": "456 Corporate Blvd\nSan Francisco, CA 94111",
+    "currency_index": 0,
+    "tax_rate": 8,
+    "notes": "Thank you for your business!\nPayment via PayPal, Wise, or bank transfer.",
+}
+
+# Invoice-specific fields; unlike FORM_DEFAULTS these survive reset_form() and
+# template loads.
+def invoice_defaults():
+    today = date.today()
+    defaults = {
+        "invoice_number": "INV-2025-001",
+        "invoice_date": today,
+        "due_date": today + timedelta(days=30),
+    }
+    for i in range(LINE_ITEM_COUNT):
+        defaults[f"desc{i}"] = "Web Design Services" if i == 0 else ""
+        defaults[f"qty{i}"] = 1
+        defaults[f"rate{i}"] = 250.0 if i == 0 else 0.0
+    return defaults
+
+def init_form_defaults():
+    for key, value in {**FORM_DEFAULTS, **invoice_defaults()}.items():
+        if key not in st.session_state:
+            st.session_state[key] = value
+
+def load_template_into_form(template):
+    for key in ["your_name", "your_email", "your_address", "client_name", "client_email", "client_address"]:
+        st.session_state[key] = template[key] or FORM_DEFAULTS[key]
+    currency_list = list(CURRENCIES.keys())
+    st.session_state.currency_index = currency_list.index(template["currency"]) if template.get("currency") in currency_list else 0
+    st.session_state.tax_rate = template["tax_rate"] if template.get("tax_rate") is not None else FORM_DEFAULTS["tax_rate"]
+    st.session_state.notes = template["notes"] if template.get("notes") else FORM_DEFAULTS["notes"]
+    st.session_state.template_loaded_id = template["id"]
+
+def reset_form():
+    for key, value in FORM_DEFAULTS.items():
+        st.session_state[key] = value
+    st.session_state.template_loaded_id = None
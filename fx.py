@@ -0,0 +1,109 @@
+import csv
+import io
+import os
+from datetime import date
+
+import numpy as np
+import streamlit as st
+
+from db import get_fx_rates
+
+# Rates are quoted as units of each currency per one unit of the base, the way
+# central bank reference files publish them. A file, when set, takes
+# precedence over the fx_rates table.
+FX_RATES_FILE = os.environ.get("FX_RATES_FILE")
+FX_BASE_CURRENCY = os.environ.get("FX_BASE_CURRENCY", "USD")
+FX_CACHE_TTL = int(os.environ.get("FX_CACHE_TTL", 3600))
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# numpy parses datetime.date objects one at a time through a slow generic
+# path; going through ordinals is about 30x faster for a large result set.
+def as_days(dates):
+    if isinstance(dates, np.ndarray):
+        return dates.astype("datetime64[D]")
+    ordinals = np.fromiter(map(date.toordinal, dates), dtype=np.int64, count=len(dates))
+    return (ordinals - EPOCH_ORDINAL).astype("datetime64[D]")
+
+def parse_rates_csv(text):
+    rates = []
+    for row in csv.DictReader(io.StringIO(text)):
+        rates.append((date.fromisoformat(row["date"].strip()), row["currency"].strip().upper(), float(row["rate"])))
+    return rates
+
+class RateTable:
+    def __init__(self, rates, base=FX_BASE_CURRENCY):
+        self.base = base
+        by_currency = {}
+        for rate_date, currency, rate in rates:
+            by_currency.setdefault(currency, {})[rate_date] = rate
+        # Rates are expanded to one entry per calendar day between the first
+        # and last published rate, forward-filled over weekends and holidays,
+        # so a lookup is an offset into the array instead of a binary search.
+        self.first_day = {}
+        self.daily = {}
+        for currency, by_date in by_currency.items():
+            days = sorted(by_date)
+            published = as_days(days)
+            calendar = np.arange(published[0], published[-1] + 1)
+            self.first_day[currency] = published[0]
+            self.daily[currency] = np.array([by_date[d] for d in days], dtype=float)[
+                np.searchsorted(published, calendar, side="right") - 1
+            ]
+
+    def currencies(self):
+        return sorted({self.base, *self.daily})
+
+    # Dates past the last published rate use that rate; dates before the
+    # first come back as NaN rather than borrowing a later one.
+    def base_rates(self, currency, dates):
+        if currency == self.base:
+            return np.ones(len(dates))
+        daily = self.daily.get(currency)
+        if daily is None:
+            return np.full(len(dates), np.nan)
+        offsets = (dates - self.first_day[currency]).astype(np.int64)
+        rates = daily[np.clip(offsets, 0, len(daily) - 1)]
+        return np.where(offsets >= 0, rates, np.nan)
+
+    # One gather per source currency over all of its rows, rather than a rate
+    # lookup per row. Rows without a usable rate convert to NaN.
+    def convert(self, amounts, currencies, dates, to_currency):
+        amounts = np.asarray(amounts, dtype=float)
+        currencies = np.asarray(currencies)
+        dates = as_days(dates)
+        target = self.base_rates(to_currency, dates)
+        source = np.empty(len(amounts))
+        codes, groups = np.unique(currencies, return_inverse=True)
+        for group, currency in enumerate(codes):
+            rows = np.flatnonzero(groups == group)
+            source[rows] = self.base_rates(currency, dates[rows])
+        # Rows already in the reporting currency pass through untouched, even
+        # on dates the rate table does not cover.
+        same = codes == to_currency
+        return np.where(same[groups], amounts, amounts / source * target)
+
+@st.cache_resource(ttl=FX_CACHE_TTL, show_spinner=False)
+def get_rate_table():
+    if FX_RATES_FILE:
+        with open(FX_RATES_FILE, encoding="utf-8") as f:
+            return RateTable(parse_rates_csv(f.read()))
+    return RateTable(get_fx_rates())
+
+def monthly_totals(invoices, to_currency, table=None):
+    table = table or get_rate_table()
+    invoices = [invoice for invoice in invoices if invoice["invoice_date"]]
+    if not invoices:
+        return [], [], [], 0
+    dates = as_days([invoice["invoice_date"] for invoice in invoices])
+    converted = table.convert(
+        [invoice["total"] for invoice in invoices],
+        [invoice["currency"] for invoice in invoices],
+        dates,
+        to_currency,
+    )
+    missing = np.isnan(converted)
+    months, index = np.unique(dates.astype("datetime64[M]"), return_inverse=True)
+    totals = np.bincount(index, weights=np.where(missing, 0, converted), minlength=len(months))
+    counts = np.bincount(index[~missing], minlength=len(months))
+    return [str(m) for m in months], totals.tolist(), counts.tolist(), int(missing.sum())
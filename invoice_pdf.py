@@ -0,0 +1,121 @@
+import streamlit as st
+from io import BytesIO
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image as RLImage
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.lib import colors
+
+from currency import CURRENCIES, format_amounts, format_currency
+
+def create_invoice_pdf(invoice, logo=None):
+    invoice_number = invoice["invoice_number"]
+    currency_code = invoice["currency"]
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.7*inch)
+    styles = getSampleStyleSheet()
+    story = []
+
+    if logo:
+        # A file path lets ReportLab embed a JPEG as-is; raw bytes get decoded.
+        logo_img = RLImage(logo if isinstance(logo, str) else BytesIO(logo), width=80, height=80)
+        logo_img.hAlign = 'LEFT'
+        header_table = Table([
+            [logo_img, Paragraph(f"<font size=24 color='#1E3A8A'><b>INVOICE</b></font><br/><font size=12><b>#{invoice_number}</b></font>", styles["Normal"])]
+        ], colWidths=[1.5*inch, 4.5*inch])
+    else:
+        header_table = Table([
+            [Paragraph(f"<font size=24 color='#1E3A8A'><b>INVOICE</b></font>", styles["Normal"]),
+             Paragraph(f"<font size=12><b>#{invoice_number}</b></font>", styles["Normal"])]
+        ], colWidths=[4*inch, 2*inch])
+
+    header_table.setStyle(TableStyle([
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('ALIGN', (1,0), (1,0), 'RIGHT'),
+    ]))
+    story.append(header_table)
+    story.append(Spacer(1, 30))
+
+    from_text = f"<b>From:</b><br/>{invoice['your_name']}<br/>{invoice['your_email']}<br/>{invoice['your_address'].replace(chr(10), '<br/>')}"
+    to_text = f"<b>Bill To:</b><br/>{invoice['client_name']}<br/>{invoice['client_email']}<br/>{invoice['client_address'].replace(chr(10), '<br/>')}"
+
+    data = [
+        [Paragraph(from_text, styles["Normal"]),
+         Paragraph(to_text, styles["Normal"])]
+    ]
+    bill_table = Table(data, colWidths=[2.8*inch, 2.8*inch])
+    bill_table.setStyle(TableStyle([
+        ('BOX', (0,0), (-1,-1), 1, colors.lightgrey),
+        ('VALIGN', (0,0), (-1,-1), 'TOP'),
+        ('PADDING', (0,0), (-1,-1), 10),
+    ]))
+    story.append(bill_table)
+    story.append(Spacer(1, 20))
+
+    meta_data = [
+        ["Invoice Date", str(invoice["invoice_date"])],
+        ["Due Date", str(invoice["due_date"])],
+        ["Invoice #", invoice_number],
+        ["Currency", f"{CURRENCIES[currency_code]['name']} ({currency_code})"],
+    ]
+    meta_table = Table(meta_data, colWidths=[1.5*inch, 4*inch])
+    meta_table.setStyle(TableStyle([
+        ('FONTNAME', (0,0), (0,-1), 'Helvetica-Bold'),
+        ('TEXTCOLOR', (0,0), (0,-1), colors.HexColor("#374151")),
+    ]))
+    story.append(meta_table)
+    story.append(Spacer(1, 30))
+
+    table_data = [["Description", "Qty", "Rate", "Amount"]]
+    items = [item for item in invoice["items"] if item["desc"]]
+    rates = format_amounts([item["rate"] for item in items], currency_code)
+    totals = format_amounts([item["total"] for item in items], currency_code)
+    for item, rate, total in zip(items, rates, totals):
+        table_data.append([item["desc"], str(item["qty"]), rate, total])
+    table_data.append(["", "", "Subtotal", format_currency(invoice["subtotal"], currency_code)])
+    table_data.append(["", "", f"Tax ({invoice['tax_rate']}%)", format_currency(invoice["tax"], currency_code)])
+    table_data.append(["", "", Paragraph("<b>Total</b>", styles["Normal"]),
+                      Paragraph(f"<b>{format_currency(invoice['total'], currency_code)}</b>", styles["Normal"])])
+
+    item_table = Table(table_data, colWidths=[3.2*inch, 0.7*inch, 1*inch, 1*inch])
+    item_table.setStyle(TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#3B82F6")),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+        ('ALIGN', (1,0), (-1,-1), 'RIGHT'),
+        ('ALIGN', (0,0), (0,-1), 'LEFT'),
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('FONTNAME', (0,-1), (-1,-1), 'Helvetica-Bold'),
+        ('GRID', (0,0), (-1,-1), 1, colors.lightgrey),
+        ('PADDING', (0,0), (-1,-1), 8),
+        ('BACKGROUND', (2,-3), (-1,-1), colors.HexColor("#F3F4F6")),
+    ]))
+    story.append(item_table)
+    story.append(Spacer(1, 30))
+
+    notes = invoice["notes"]
+    if notes:
+        story.append(Paragraph("<b>Notes</b>", styles["Normal"]))
+        story.append(Spacer(1, 5))
+        notes_style = ParagraphStyle(
+            'Notes',
+            parent=styles['Normal'],
+            textColor=colors.HexColor("#6B7280"),
+            fontSize=10
+        )
+        story.append(Paragraph(notes.replace("\n","<br/>"), notes_style))
+
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
+
+# Hand the BytesIO itself to Streamlit: it calls getvalue(), which shares the
+# buffer's storage instead of copying it. The file is then served over HTTP by
+# the media file manager rather than pushed through the websocket.
+def pdf_download_button(pdf_buffer, invoice_number, label="Download Your Invoice Now", **kwargs):
+    return st.download_button(
+        label=label,
+        data=pdf_buffer,
+        file_name=f"Invoice_{invoice_number}.pdf",
+        mime="application/pdf",
+        **kwargs
+    )
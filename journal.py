@@ -0,0 +1,249 @@
+import atexit
+import base64
+import json
+import os
+import struct
+import threading
+import time
+import uuid
+import zlib
+import psycopg2
+import streamlit as st
+from datetime import date
+
+from db import invoice_field_errors, save_invoice_history_batch
+
+# Generated invoices are fsynced to a local append-only journal and written to
+# Postgres in batches by a background thread, so Generate never waits on the
+# database. Segments still on disk at startup are replayed.
+JOURNAL_DIR = os.environ.get("INVOICE_JOURNAL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "journal"))
+JOURNAL_FLUSH_DELAY = float(os.environ.get("JOURNAL_FLUSH_DELAY", 0.2))
+JOURNAL_RETRY_SECONDS = float(os.environ.get("JOURNAL_RETRY_SECONDS", 5))
+
+# Each record is framed as length + CRC32 + JSON. A crash halfway through an
+# append leaves a short or corrupt tail, which replay stops at; that record
+# was never acknowledged to the user.
+FRAME = struct.Struct(">II")
+
+def encode_record(journal_id, invoice_data, pdf_bytes):
+    payload = json.dumps({
+        "journal_id": journal_id,
+        "invoice": invoice_data,
+        "pdf": base64.b64encode(pdf_bytes).decode("ascii"),
+    }, separators=(",", ":"), default=lambda value: value.isoformat() if isinstance(value, date) else str(value)).encode()
+    return FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+def read_segment(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    records = []
+    offset = 0
+    while offset + FRAME.size <= len(data):
+        length, checksum = FRAME.unpack_from(data, offset)
+        payload = data[offset + FRAME.size:offset + FRAME.size + length]
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            break
+        record = json.loads(payload)
+        records.append((record["journal_id"], record["invoice"], base64.b64decode(record["pdf"])))
+        offset += FRAME.size + length
+    return records
+
+# Segments are named <pid>-<instance token>-<time>.journal. Tokens of the
+# journals running in this process, so a second instance (after the resource
+# cache is cleared) leaves the first one's live segments alone.
+live_tokens = set()
+
+def segment_owner(path):
+    pid, _, rest = os.path.basename(path).partition("-")
+    try:
+        return int(pid), rest.partition("-")[0]
+    except ValueError:
+        return None, None
+
+# Several server processes can share one journal directory; each only flushes
+# and deletes the segments it wrote, and picks up those of processes that died.
+# A segment with this process's pid but an unknown token was left by an
+# earlier process that had the same pid, as happens across container restarts.
+def owner_alive(pid, token):
+    if pid is None:
+        return False
+    if pid == os.getpid():
+        return token in live_tokens
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def fsync_dir(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class InvoiceJournal:
+    def __init__(self, directory=JOURNAL_DIR, save=save_invoice_history_batch, delay=JOURNAL_FLUSH_DELAY, retry=JOURNAL_RETRY_SECONDS):
+        self.directory = directory
+        self.save = save
+        self.delay = delay
+        self.retry = retry
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stats = {"appends": 0, "replayed": 0, "flushes": 0, "rows": 0, "failures": 0, "dead_letters": 0}
+        self.token = uuid.uuid4().hex[:12]
+        self.prefix = f"{os.getpid()}-{self.token}-"
+        os.makedirs(directory, exist_ok=True)
+        if not os.access(directory, os.W_OK | os.X_OK):
+            raise PermissionError(f"journal directory {directory} is not writable")
+        self.dead_letters = sum(len(read_segment(os.path.join(directory, name))) for name in os.listdir(directory) if name.endswith(".dead"))
+
+        # Segments left by a journal that is no longer running are renamed to
+        # this instance, so exactly one survivor replays each of them, and are
+        # then flushed and deleted like its own.
+        self.pending = []
+        for path in self._segments(other=True):
+            if not owner_alive(*segment_owner(path)):
+                claimed = os.path.join(self.directory, f"{self.prefix}{os.path.basename(path).split('-', 1)[-1]}")
+                try:
+                    os.rename(path, claimed)
+                except FileNotFoundError:
+                    continue
+                self.pending.extend(read_segment(claimed))
+        self.stats["replayed"] = len(self.pending)
+        self.segment = None
+        live_tokens.add(self.token)
+
+        self.thread = threading.Thread(target=self._run, name="invoice-journal", daemon=True)
+        self.thread.start()
+        if self.pending:
+            self.wake.set()
+        atexit.register(self.flush)
+
+    def _segments(self, other=False):
+        prefix = "" if other else self.prefix
+        return sorted(os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.startswith(prefix) and name.endswith(".journal"))
+
+    # Segments are opened on the first append after a flush, so an idle
+    # process leaves no empty files behind.
+    def _open_segment(self):
+        self.segment = open(os.path.join(self.directory, f"{self.prefix}{time.time_ns():020d}.journal"), "ab")
+        fsync_dir(self.directory)
+
+    # Returns once the record is on disk; the database write happens later.
+    # Anything the table would reject outright is refused here, while the
+    # user can still fix it.
+    def append(self, invoice_data, pdf_bytes):
+        errors = invoice_field_errors(invoice_data)
+        if errors:
+            raise ValueError("; ".join(errors))
+        journal_id = uuid.uuid4().hex
+        frame = encode_record(journal_id, invoice_data, pdf_bytes)
+        with self.lock:
+            if self.segment is None:
+                self._open_segment()
+            self.segment.write(frame)
+            self.segment.flush()
+            os.fsync(self.segment.fileno())
+            self.pending.append((journal_id, invoice_data, pdf_bytes))
+            self.stats["appends"] += 1
+        self.wake.set()
+        return journal_id
+
+    def pending_count(self):
+        with self.lock:
+            return len(self.pending)
+
+    def _run(self):
+        while True:
+            self.wake.wait()
+            # Give invoices generated at about the same time a moment to
+            # arrive, so they share one INSERT.
+            time.sleep(self.delay)
+            self.wake.clear()
+            # Anything unexpected (a full disk, say) must not end the thread:
+            # the records stay pending and on disk, and are tried again.
+            try:
+                flushed = self.flush()
+            except Exception:
+                with self.lock:
+                    self.stats["failures"] += 1
+                flushed = False
+            if not flushed:
+                time.sleep(self.retry)
+                self.wake.set()
+
+    # Everything pending moves to the database in one transaction. The
+    # segment being written is sealed first, so once the batch commits every
+    # sealed segment is fully in Postgres and can be deleted.
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                batch = self.pending
+                if not batch:
+                    return True
+                self.pending = []
+                if self.segment is not None:
+                    self.segment.close()
+                    self.segment = None
+                sealed = self._segments()
+            retry, dead = self._save(batch)
+            if dead:
+                try:
+                    self._set_aside(dead)
+                except OSError:
+                    retry, dead = retry + dead, []
+            if retry:
+                with self.lock:
+                    self.pending = retry + self.pending
+                    self.stats["failures"] += 1
+                return False
+            for path in sealed:
+                os.remove(path)
+            with self.lock:
+                self.stats["flushes"] += 1
+                self.stats["rows"] += len(batch) - len(dead)
+            return True
+
+    # One bad row fails the whole INSERT, so a failed batch is retried row by
+    # row. Rows the database rejects as data are dead letters; on any other
+    # error (usually the connection) the rest waits for the next attempt.
+    def _save(self, batch):
+        try:
+            self.save(batch)
+            return [], []
+        except Exception:
+            pass
+        dead = []
+        for i, record in enumerate(batch):
+            try:
+                self.save([record])
+            except (psycopg2.DataError, psycopg2.IntegrityError):
+                dead.append(record)
+            except Exception:
+                return batch[i:], dead
+        return [], dead
+
+    def _set_aside(self, records):
+        path = os.path.join(self.directory, f"{self.prefix}{time.time_ns():020d}.dead")
+        with open(path, "wb") as f:
+            for record in records:
+                f.write(encode_record(*record))
+            f.flush()
+            os.fsync(f.fileno())
+        fsync_dir(self.directory)
+        with self.lock:
+            self.dead_letters += len(records)
+            self.stats["dead_letters"] += len(records)
+
+# None when the journal directory cannot be created or written (a read-only
+# deployment); invoices are then saved synchronously instead.
+@st.cache_resource
+def get_invoice_journal():
+    try:
+        return InvoiceJournal()
+    except OSError:
+        return None
@@ -0,0 +1,63 @@
+import hashlib
+import os
+import tempfile
+import streamlit as st
+from io import BytesIO
+
+from db import get_logo, get_logo_hash
+
+# st.image shows the preview at 150px, so keep 2x for high-DPI screens.
+PREVIEW_SIZE = (300, 300)
+# invoice_pdf draws the logo in an 80pt box; 80pt at 300 DPI is 333px.
+PDF_SIZE = (333, 333)
+
+LOGO_CACHE_DIR = os.environ.get("LOGO_CACHE_DIR", os.path.join(tempfile.gettempdir(), "invoice-ninja-logos"))
+
+def logo_hash(logo_bytes):
+    return hashlib.sha256(logo_bytes).hexdigest()
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def process_logo(content_hash, _logo_bytes):
+    from PIL import Image, ImageOps
+
+    img = Image.open(BytesIO(_logo_bytes))
+    # For JPEGs this makes the decoder scale by 1/2, 1/4 or 1/8 while decoding,
+    # so a 12MP phone photo never gets decoded at full size.
+    img.draft("RGB", (max(PREVIEW_SIZE[0], PDF_SIZE[0]), max(PREVIEW_SIZE[1], PDF_SIZE[1])))
+    # Phone cameras store the sensor's orientation and an EXIF tag to rotate by.
+    img = ImageOps.exif_transpose(img)
+    img = img.convert("RGB")
+
+    preview = img.copy()
+    preview.thumbnail(PREVIEW_SIZE, reducing_gap=3.0)
+    preview_buffer = BytesIO()
+    preview.save(preview_buffer, format="PNG")
+
+    pdf = img.copy()
+    pdf.thumbnail(PDF_SIZE, reducing_gap=3.0)
+    pdf_buffer = BytesIO()
+    # JPEG so ReportLab can copy the DCT stream into the PDF without decoding it.
+    pdf.save(pdf_buffer, format="JPEG", quality=95, subsampling=0)
+
+    return {
+        "hash": content_hash,
+        "preview": preview_buffer.getvalue(),
+        "pdf": pdf_buffer.getvalue(),
+    }
+
+# ReportLab only skips decoding when it is given a JPEG by file name, so the
+# PDF variant is materialized once per content hash in a local cache directory.
+def pdf_logo():
+    content_hash = get_logo_hash()
+    if not content_hash:
+        logo_data = get_logo()
+        return bytes(logo_data) if logo_data else None
+
+    path = os.path.join(LOGO_CACHE_DIR, f"{content_hash}.jpg")
+    if not os.path.exists(path):
+        os.makedirs(LOGO_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(get_logo("pdf"))
+        os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,26 @@
+import os
+import smtplib
+from email.mime.multipart import MIMEMultipart
+from email.mime.base import MIMEBase
+from email.mime.text import MIMEText
+from email import encoders
+
+def send_invoice_email(pdf_bytes, invoice_number, sender, recipient, subject, body):
+    msg = MIMEMultipart()
+    msg['From'] = os.environ.get("SMTP_FROM", sender)
+    msg['To'] = recipient
+    msg['Subject'] = subject
+
+    msg.attach(MIMEText(body, 'plain'))
+
+    part = MIMEBase('application', 'octet-stream')
+    part.set_payload(pdf_bytes)
+    encoders.encode_base64(part)
+    part.add_header('Content-Disposition', f'attachment; filename="Invoice_{invoice_number}.pdf"')
+    msg.attach(part)
+
+    server = smtplib.SMTP(os.environ.get("SMTP_SERVER", ""), int(os.environ.get("SMTP_PORT", 587)))
+    server.starttls()
+    server.login(os.environ.get("SMTP_USER", ""), os.environ.get("SMTP_PASSWORD", ""))
+    server.send_message(msg)
+    server.quit()
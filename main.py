@@ -1,13 +1,5 @@
 import streamlit as st
 from datetime import datetime
-import base64
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_RIGHT
-from io import BytesIO
 
 st.set_page_config(page_title="Invoice Ninja AI", layout="centered")
 st.title("Invoice Ninja AI")
@@ -68,76 +60,30 @@ with col2:
 with col3:
     st.metric("Total", f"\( {total:,.2f}", f"+ \){tax:,.2f} tax")
 
-# Generate PDF
-def create_invoice_pdf():
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.7*inch)
-    styles = getSampleStyleSheet()
-    story = []
-
-    # Header
-    logo = Image("https://i.imgur.com/8QvJ5eK.png", width=80, height=80)
-    logo.hAlign = 'LEFT'
-    header_table = Table([[logo, Paragraph(f"<font size=18><b>INVOICE</b></font><br/>#{invoice_number}", styles["Normal"])]])
-    header_table.setStyle(TableStyle([('VALIGN', (0,0), (-1,-1), 'TOP')]))
-    story.append(header_table)
-    story.append(Spacer(1, 20))
-
-    # Bill To / From
-    data = [
-        [Paragraph("<b>From:</b><br/>" + your_name.replace("\n","<br/>") + f"<br/>{your_email}<br/>" + your_address.replace("\n","<br/>"), styles["Normal"]),
-         Paragraph("<b>Bill To:</b><br/>" + client_name + f"<br/>{client_email}<br/>" + client_address.replace("\n","<br/>"), styles["Normal"])]
-    ]
-    bill_table = Table(data, colWidths=[2.8*inch, 2.8*inch])
-    bill_table.setStyle(TableStyle([('BOX', (0,0), (-1,-1), 1, colors.lightgrey),
-                                   ('VALIGN', (0,0), (-1,-1), 'TOP')]))
-    story.append(bill_table)
-    story.append(Spacer(1, 20))
-
-    # Invoice meta
-    meta_data = [
-        ["Invoice Date", str(invoice_date)],
-        ["Due Date", str(due_date)],
-        ["Invoice #", invoice_number],
-    ]
-    meta_table = Table(meta_data, colWidths=[1.5*inch, 4*inch])
-    story.append(meta_table)
-    story.append(Spacer(1, 30))
-
-    # Line items table
-    table_data = [["Description", "Qty", "Rate", "Amount"]]
-    for item in items:
-        if item["desc"]:
-            table_data.append([item["desc"], str(item["qty"]), f"\( {item['rate']:,.2f}", f" \){item['total']:,.2f}"])
-    table_data.append(["", "", "Subtotal", f"${subtotal:,.2f}"])
-    table_data.append(["", "", f"Tax ({tax_rate}%)", f"${tax:,.2f}"])
-    table_data.append(["", "", Paragraph("<b>Total</b>", styles["Normal"]), Paragraph(f"<b>${total:,.2f}</b>", styles["Normal"])])
-
-    item_table = Table(table_data, colWidths=[3.2*inch, 0.7*inch, 1*inch, 1*inch])
-    item_table.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#3B82F6")),
-        ('TEXTCOLOR', (0,0), (-1,0), colors.white),
-        ('ALIGN', (1,-3), (-1,-1), 'RIGHT'),
-        ('FONTNAME', (0,-2), (-1,-1), 'Helvetica-Bold'),
-        ('GRID', (0,0), (-1,-1), 1, colors.lightgrey),
-    ]))
-    story.append(item_table)
-    story.append(Spacer(1, 30))
-
-    # Notes
-    if notes:
-        story.append(Paragraph("<b>Notes</b>", styles["Normal"]))
-        story.append(Paragraph(notes.replace("\n","<br/>"), styles["Normal"]))
-
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
+invoice = {
+    "invoice_number": invoice_number,
+    "invoice_date": invoice_date,
+    "due_date": due_date,
+    "your_name": your_name,
+    "your_email": your_email,
+    "your_address": your_address,
+    "client_name": client_name,
+    "client_email": client_email,
+    "client_address": client_address,
+    "currency": "USD",
+    "items": items,
+    "subtotal": subtotal,
+    "tax_rate": tax_rate,
+    "tax": tax,
+    "total": total,
+    "notes": notes
+}
 
 if st.button("Generate & Download PDF Invoice", type="primary"):
-    pdf_buffer = create_invoice_pdf()
-    b64 = base64.b64encode(pdf_buffer.read()).decode()
-    href = f'<a href="data:application/pdf;base64,{b64}" download="Invoice_{invoice_number}.pdf">Download Your Invoice Now</a>'
-    st.markdown(href, unsafe_allow_html=True)
+    from invoice_pdf import create_invoice_pdf, pdf_download_button
+
+    pdf_buffer = create_invoice_pdf(invoice)
+    pdf_download_button(pdf_buffer, invoice_number)
     st.success("Invoice ready! Click above to download.")
     st.balloons()
 
@@ -1,12 +1,5 @@
 import streamlit as st
 from datetime import date
-import base64
-from io import BytesIO
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-from reportlab.lib.units import inch
 
 st.set_page_config(page_title="Invoice Ninja AI", layout="centered")
 
@@ -61,55 +54,30 @@ m1, m2, m3 = st.columns([2,1,1])
 with m2: st.metric("Subtotal", f"${subtotal:,.2f}")
 with m3: st.metric("Total", f"\( {total:,.2f}", f"+ \){tax:,.2f} tax")
 
-def make_pdf():
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.7*inch)
-    styles = getSampleStyleSheet()
-    story = []
-
-    logo = Image("https://i.imgur.com/8QvJ5eK.png", width=80, height=80)
-    header = Table([[logo, Paragraph(f"<font size=18><b>INVOICE</b></font><br/>#{invoice_no}", styles["Normal"])]])
-    header.setStyle(TableStyle([("VALIGN",(0,0),(-1,-1),"TOP")]))
-    story.append(header)
-    story.append(Spacer(1,20))
-
-    bill_data = [
-        [Paragraph(f"<b>From:</b><br/>{your_name}<br/>{your_email}<br/>{your_address.replace('\n','<br/>')}", styles["Normal"]),
-         Paragraph(f"<b>Bill To:</b><br/>{client_name}<br/>{client_email}<br/>{client_address.replace('\n','<br/>')}", styles["Normal"])]
-    ]
-    bill_table = Table(bill_data, colWidths=[2.8*inch, 2.8*inch])
-    bill_table.setStyle(TableStyle([("BOX",(0,0),(-1,-1),1,colors.lightgrey)]))
-    story.append(bill_table)
-    story.append(Spacer(1,30))
-
-    line_data = [["Description","Qty","Rate","Amount"]]
-    for it in items:
-        line_data.append([it["desc"], str(it["qty"]), f"\( {it['rate']:,.2f}", f" \){it['total']:,.2f}"])
-    line_data += [["","", "Subtotal", f"\( {subtotal:,.2f}"], ["","", f"Tax {tax_rate}%", f" \){tax:,.2f}"], ["","", Paragraph("<b>Total</b>"), Paragraph(f"<b>${total:,.2f}</b>")]]
-    line_table = Table(line_data, colWidths=[3.2*inch,0.7*inch,1*inch,1*inch])
-    line_table.setStyle(TableStyle([
-        ("BACKGROUND",(0,0),(-1,0),colors.HexColor("#3B82F6")),
-        ("TEXTCOLOR",(0,0),(-1,0),colors.white),
-        ("GRID",(0,0),(-1,-1),1,colors.lightgrey),
-        ("ALIGN",(1,-3),(-1,-1),"RIGHT"),
-        ("FONTNAME",(-2,-2),(-1,-1),"Helvetica-Bold")
-    ]))
-    story.append(line_table)
-
-    if notes.strip():
-        story.append(Spacer(1,20))
-        story.append(Paragraph("<b>Notes</b>", styles["Normal"]))
-        story.append(Paragraph(notes.replace("\n","<br/>"), styles["Normal"]))
-
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
+invoice = {
+    "invoice_number": invoice_no,
+    "invoice_date": invoice_date,
+    "due_date": due_date,
+    "your_name": your_name,
+    "your_email": your_email,
+    "your_address": your_address,
+    "client_name": client_name,
+    "client_email": client_email,
+    "client_address": client_address,
+    "currency": "USD",
+    "items": items,
+    "subtotal": subtotal,
+    "tax_rate": tax_rate,
+    "tax": tax,
+    "total": total,
+    "notes": notes
+}
 
 if st.button("Generate & Download PDF Invoice", type="primary"):
-    pdf = make_pdf()
-    b64 = base64.b64encode(pdf.read()).decode()
-    href = f'<a href="data:application/pdf;base64,{b64}" download="Invoice_{invoice_no}.pdf">Download Invoice Now</a>'
-    st.markdown(href, unsafe_allow_html=True)
+    from invoice_pdf import create_invoice_pdf, pdf_download_button
+
+    pdf = create_invoice_pdf(invoice)
+    pdf_download_button(pdf, invoice_no, label="Download Invoice Now")
     st.success("Invoice ready! Click above to download.")
     st.balloons()
 
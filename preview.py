@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+import streamlit as st
+from collections import OrderedDict
+from datetime import date
+from io import BytesIO
+
+# The Create page asks for a preview on every rerun; the request only starts
+# rendering once the form has been still for PREVIEW_DEBOUNCE_SECONDS, and the
+# page polls for the result every PREVIEW_POLL_SECONDS.
+PREVIEW_DEBOUNCE_SECONDS = float(os.environ.get("PREVIEW_DEBOUNCE_SECONDS", 0.25))
+PREVIEW_POLL_SECONDS = float(os.environ.get("PREVIEW_POLL_SECONDS", 0.5))
+PREVIEW_CACHE_SIZE = int(os.environ.get("PREVIEW_CACHE_SIZE", 8))
+# Thumbnail width in pixels, about 2x the column it is shown in.
+PREVIEW_WIDTH = int(os.environ.get("PREVIEW_WIDTH", 700))
+
+def payload_hash(invoice):
+    payload = json.dumps(invoice, sort_keys=True, separators=(",", ":"), default=lambda value: value.isoformat() if isinstance(value, date) else str(value))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+# pypdfium2 is a dependency, but a native wheel that not every platform has;
+# without it the preview is offered as a PDF only.
+def rasterize(pdf_bytes, width=PREVIEW_WIDTH):
+    try:
+        import pypdfium2
+    except ImportError:
+        return None
+    document = pypdfium2.PdfDocument(pdf_bytes)
+    try:
+        page = document[0]
+        image = page.render(scale=width / page.get_width()).to_pil()
+    finally:
+        document.close()
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+class PreviewRenderer:
+    def __init__(self, debounce=PREVIEW_DEBOUNCE_SECONDS, cache_size=PREVIEW_CACHE_SIZE):
+        self.debounce = debounce
+        self.cache_size = cache_size
+        self.lock = threading.Condition()
+        self.cache = OrderedDict()
+        # At most one waiting request per session; a newer one replaces it.
+        self.requests = {}
+        self.rendering = None
+        self.stats = {"requests": 0, "cache_hits": 0, "renders": 0, "superseded": 0, "failures": 0}
+        self.thread = threading.Thread(target=self._run, name="invoice-preview", daemon=True)
+        self.thread.start()
+
+    def request(self, session_key, invoice):
+        key = payload_hash(invoice)
+        with self.lock:
+            self.stats["requests"] += 1
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                self.requests.pop(session_key, None)
+            elif self.rendering == (session_key, key):
+                self.requests.pop(session_key, None)
+            elif self.requests.get(session_key, (None,))[0] != key:
+                self.requests[session_key] = (key, invoice, time.monotonic() + self.debounce)
+                self.lock.notify()
+        return key
+
+    def get(self, key):
+        with self.lock:
+            return self.cache.get(key)
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+
+    def _superseded(self, session_key, key):
+        with self.lock:
+            pending = self.requests.get(session_key)
+        return pending is not None and pending[0] != key
+
+    def _next_request(self):
+        with self.lock:
+            while True:
+                if self.requests:
+                    session_key, (key, invoice, due) = min(self.requests.items(), key=lambda item: item[1][2])
+                    wait = due - time.monotonic()
+                    if wait <= 0:
+                        del self.requests[session_key]
+                        if key not in self.cache:
+                            self.rendering = (session_key, key)
+                            return session_key, key, invoice
+                        continue
+                    self.lock.wait(wait)
+                else:
+                    self.lock.wait()
+
+    # One worker renders for every session: rendering is CPU-bound either way,
+    # and pypdfium2 must not be used from two threads at once. A render is
+    # dropped between the PDF and the thumbnail if the same session has asked
+    # for something newer by then.
+    def _run(self):
+        from invoice_pdf import create_invoice_pdf
+        from logos import pdf_logo
+
+        while True:
+            session_key, key, invoice = self._next_request()
+            try:
+                pdf_bytes = create_invoice_pdf(invoice, pdf_logo()).getvalue()
+                if self._superseded(session_key, key):
+                    with self.lock:
+                        self.rendering = None
+                        self.stats["superseded"] += 1
+                    continue
+                result = {"pdf": pdf_bytes, "image": rasterize(pdf_bytes), "error": None}
+            except Exception as e:
+                # Cached like a render, so the page stops waiting for it.
+                result = {"pdf": None, "image": None, "error": str(e)}
+                with self.lock:
+                    self.stats["failures"] += 1
+            with self.lock:
+                self.rendering = None
+                self.cache[key] = result
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+                if result["error"] is None:
+                    self.stats["renders"] += 1
+
+@st.cache_resource
+def get_preview_renderer():
+    return PreviewRenderer()
+
+# The preview is the same create_invoice_pdf output, so Generate can hand it
+# out as is when the form has not changed since it was rendered.
+def cached_preview_pdf(invoice):
+    result = get_preview_renderer().get(payload_hash(invoice))
+    return result["pdf"] if result else None
+
+def show_preview(result, invoice_number):
+    if result["error"]:
+        st.warning(f"Preview unavailable: {result['error']}")
+    elif result["image"]:
+        st.image(result["image"], width="stretch")
+    else:
+        from invoice_pdf import pdf_download_button
+
+        pdf_download_button(result["pdf"], invoice_number, label="Download Preview", key="preview_download", on_click="ignore", width="stretch")
+        st.caption("Install pypdfium2 to see the preview on this page.")
+
+# Requests are per browser session, not per draft: a duplicated tab shares the
+# draft but must not replace the other tab's request.
+def preview_session():
+    if "preview_session" not in st.session_state:
+        st.session_state.preview_session = uuid.uuid4().hex
+    return st.session_state.preview_session
+
+# While a render is outstanding the fragment polls for it, showing the last
+# preview meanwhile; once it lands, one full rerun draws it and stops the
+# polling. Each poll repeats the request, which is a no-op while it is pending
+# or rendering but brings back one that was superseded or evicted unseen.
+@st.fragment(run_every=PREVIEW_POLL_SECONDS)
+def poll_preview(invoice):
+    renderer = get_preview_renderer()
+    if renderer.get(renderer.request(preview_session(), invoice)) is not None:
+        st.rerun()
+    shown = renderer.get(st.session_state.get("preview_shown"))
+    if shown is not None:
+        show_preview(shown, invoice["invoice_number"])
+    st.caption("Updating preview...")
+
+def live_preview(invoice):
+    key = get_preview_renderer().request(preview_session(), invoice)
+    result = get_preview_renderer().get(key)
+    if result is None:
+        poll_preview(invoice)
+        return
+    st.session_state.preview_shown = key
+    show_preview(result, invoice["invoice_number"])
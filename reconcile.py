@@ -0,0 +1,350 @@
+import csv
+import hashlib
+import io
+import math
+import re
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from currency import currency_decimals
+from db import get_known_payment_fingerprints, iter_open_invoices, save_payments
+
+TOKEN_RE = re.compile(r"[A-Za-z0-9]+")
+SEPARATOR_RE = re.compile(r"[^A-Za-z0-9]+")
+AMOUNT_NOISE_RE = re.compile(r"[^0-9,.]")
+OFX_TRANSACTION_RE = re.compile(r"<STMTTRN>(.*?)(?:</STMTTRN>|(?=<STMTTRN>)|(?=</BANKTRANLIST>))", re.S | re.I)
+OFX_FIELD_RE = re.compile(r"<(\w+)>([^<\r\n]*)")
+OFX_CURRENCY_RE = re.compile(r"<CURDEF>\s*([A-Za-z]{3})", re.I)
+
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%d.%m.%Y", "%Y%m%d", "%d-%m-%Y"]
+CSV_COLUMNS = {
+    "date": ["date", "transaction date", "posted date", "booking date", "value date"],
+    "amount": ["amount", "credit", "paid in", "value"],
+    "memo": ["description", "memo", "reference", "details", "narrative", "payee", "name"],
+    "currency": ["currency", "ccy"],
+}
+# Longest run of memo tokens glued together when looking for an invoice
+# number, e.g. "INV 2025 001" -> "INV2025001".
+MAX_REFERENCE_TOKENS = 4
+# How far down an amount bucket to look for a better-scoring invoice before
+# settling for the oldest one.
+AMOUNT_CANDIDATES = 20
+FUZZY_THRESHOLD = 0.6
+
+def normalize_reference(text):
+    return SEPARATOR_RE.sub("", text or "").upper()
+
+# Amounts are compared as integers in the currency's minor unit: yen, cents
+# or fils.
+def to_minor_units(amount, currency):
+    return int(Decimal(amount).scaleb(currency_decimals(currency)).to_integral_value())
+
+# The decimal separator an amount implies on its own: the last of "," and "."
+# when both appear, the other one when a separator repeats ("1,234,567"). A
+# lone separator followed by three digits is grouping unless the currency has
+# three decimals, where "1,234" could be 1234 or 1.234 (None). "" means the
+# amount has no fraction either way.
+def implied_decimal(text, currency="USD"):
+    digits = AMOUNT_NOISE_RE.sub("", text or "")
+    last = max(digits.rfind(","), digits.rfind("."))
+    if last < 0:
+        return ""
+    separator = digits[last]
+    other = "." if separator == "," else ","
+    if other in digits:
+        return separator
+    if digits.count(separator) > 1:
+        return other
+    if len(digits) - last - 1 == 3:
+        return None if currency_decimals(currency) == 3 else other
+    return separator
+
+# One decimal separator per statement, taken from the amounts that show it,
+# so "1,234" in a file of "1,234.56" lines is read the same way as the rest.
+# A file with nothing but such amounts is refused unless the format itself
+# fixes the separator. Takes (amount, currency) pairs.
+def statement_decimal(amounts, default=None):
+    implied = {implied_decimal(text, currency) for text, currency in amounts if text}
+    implied.discard("")
+    ambiguous = None in implied
+    implied.discard(None)
+    if len(implied) > 1:
+        raise ValueError("Amounts use both , and . as the decimal separator")
+    if implied:
+        return implied.pop()
+    if ambiguous and default is None:
+        raise ValueError("Amounts such as 1,234 (in a three-decimal currency) could be read with either decimal separator")
+    return default or "."
+
+def parse_amount(text, decimal="."):
+    text = (text or "").strip()
+    negative = "-" in text or (text.startswith("(") and text.endswith(")"))
+    digits = AMOUNT_NOISE_RE.sub("", text)
+    digits = digits.replace("," if decimal == "." else ".", "").replace(decimal, ".")
+    if not digits:
+        return None
+    try:
+        amount = Decimal(digits)
+    except InvalidOperation:
+        return None
+    return -amount if negative else amount
+
+def parse_date(text, formats=DATE_FORMATS):
+    text = (text or "").strip()[:10]
+    for fmt in formats:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+# One date format per statement: the first that reads every line, else the one
+# that reads the most. If day-first and month-first both read every line
+# differently ("03/04/2025"), day_first has to say which one is meant.
+def statement_date_format(texts, day_first=None):
+    texts = [text for text in texts if text and text.strip()]
+    formats = DATE_FORMATS
+    if day_first is not None:
+        formats = [fmt for fmt in formats if fmt != ("%m/%d/%Y" if day_first else "%d/%m/%Y")]
+    matching = [fmt for fmt in formats if all(parse_date(text, [fmt]) for text in texts)]
+    if not matching:
+        return max(formats, key=lambda fmt: sum(parse_date(text, [fmt]) is not None for text in texts))
+    if "%d/%m/%Y" in matching and "%m/%d/%Y" in matching:
+        if any(parse_date(text, ["%d/%m/%Y"]) != parse_date(text, ["%m/%d/%Y"]) for text in texts):
+            raise ValueError("Dates such as 03/04/2025 could be day or month first; choose the date order")
+    return matching[0]
+
+def fingerprint(*parts):
+    return hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()
+
+def parse_csv(data, default_currency="USD", day_first=None):
+    reader = csv.DictReader(io.StringIO(data.decode("utf-8-sig")))
+    columns = {}
+    for field in reader.fieldnames or []:
+        for name, aliases in CSV_COLUMNS.items():
+            if name not in columns and field.strip().lower() in aliases:
+                columns[name] = field
+    if "date" not in columns or "amount" not in columns:
+        raise ValueError("CSV needs at least a date and an amount column")
+
+    rows = list(reader)
+    currencies = [(row.get(columns.get("currency")) or default_currency).strip().upper() for row in rows]
+    decimal = statement_decimal(zip((row.get(columns["amount"]) for row in rows), currencies))
+    date_format = statement_date_format((row.get(columns["date"]) for row in rows), day_first)
+    transactions = []
+    seen = defaultdict(int)
+    for row, currency in zip(rows, currencies):
+        amount = parse_amount(row.get(columns["amount"]), decimal)
+        payment_date = parse_date(row.get(columns["date"]), [date_format])
+        if amount is None or payment_date is None:
+            continue
+        memo = (row.get(columns.get("memo")) or "").strip()
+        # Identical lines on the same day are separate payments, so the
+        # occurrence count is part of the fingerprint.
+        key = (payment_date, amount, currency, memo)
+        seen[key] += 1
+        transactions.append({
+            "fingerprint": fingerprint("csv", *key, seen[key]),
+            "source": "csv",
+            "payment_date": payment_date,
+            "amount": amount,
+            "currency": currency,
+            "memo": memo,
+        })
+    return transactions
+
+def parse_ofx(data, default_currency="USD"):
+    text = data.decode("utf-8", errors="replace")
+    match = OFX_CURRENCY_RE.search(text)
+    currency = match.group(1).upper() if match else default_currency
+    blocks = [{name.upper(): value.strip() for name, value in OFX_FIELD_RE.findall(block)} for block in OFX_TRANSACTION_RE.findall(text)]
+    # OFX specifies "." but some banks write ",".
+    decimal = statement_decimal(((fields.get("TRNAMT"), currency) for fields in blocks), ".")
+    transactions = []
+    for fields in blocks:
+        amount = parse_amount(fields.get("TRNAMT"), decimal)
+        payment_date = parse_date(fields.get("DTPOSTED", "")[:8])
+        if amount is None or payment_date is None:
+            continue
+        memo = " ".join(v for v in [fields.get("NAME"), fields.get("MEMO")] if v)
+        transactions.append({
+            "fingerprint": fingerprint("ofx", fields.get("FITID") or (payment_date, amount, memo)),
+            "source": "ofx",
+            "payment_date": payment_date,
+            "amount": amount,
+            "currency": currency,
+            "memo": memo,
+        })
+    return transactions
+
+def parse_statement(filename, data, default_currency="USD", day_first=None):
+    if filename.lower().endswith((".ofx", ".qfx")):
+        return parse_ofx(data, default_currency)
+    return parse_csv(data, default_currency, day_first)
+
+def reference_candidates(memo):
+    tokens = [t.upper() for t in TOKEN_RE.findall(memo or "")]
+    return [
+        "".join(tokens[i:i + n])
+        for n in range(1, MAX_REFERENCE_TOKENS + 1)
+        for i in range(len(tokens) - n + 1)
+    ]
+
+# Index buckets hold a bare invoice id until a second one arrives. Dicts of
+# ints and strings are never tracked by the cyclic collector, while a million
+# one-item lists would set it off every few hundred rows.
+def add_to_bucket(index, key, invoice_id):
+    bucket = index.get(key)
+    if bucket is None:
+        index[key] = invoice_id
+    elif type(bucket) is int:
+        index[key] = [bucket, invoice_id]
+    else:
+        bucket.append(invoice_id)
+
+def bucket_ids(index, key):
+    bucket = index.get(key, ())
+    return (bucket,) if type(bucket) is int else bucket
+
+class InvoiceIndex:
+    def __init__(self, open_invoices):
+        self.reference = {}
+        self.currency = {}
+        self.client_id = {}
+        self.client_key = {}
+        self.outstanding = {}
+        self.by_reference = {}
+        self.by_amount = defaultdict(dict)
+        self.by_client = defaultdict(list)
+        # Rows come oldest due date first, so each bucket is in collection order.
+        for invoice_id, reference, currency, units, client_id, client_key in open_invoices:
+            self.reference[invoice_id] = reference
+            self.currency[invoice_id] = currency
+            self.client_id[invoice_id] = client_id
+            self.client_key[invoice_id] = client_key
+            self.outstanding[invoice_id] = units
+            add_to_bucket(self.by_reference, reference, invoice_id)
+            add_to_bucket(self.by_amount[currency], units, invoice_id)
+            if client_key:
+                self.by_client[client_key].append(invoice_id)
+
+    def match(self, units, currency, memo):
+        candidates = reference_candidates(memo)
+        for candidate in candidates:
+            for invoice_id in bucket_ids(self.by_reference, candidate):
+                if self.outstanding[invoice_id] > 0 and self.currency[invoice_id] == currency:
+                    return invoice_id, "reference"
+
+        clients = {c for c in candidates if c in self.by_client}
+        memo_key = normalize_reference(memo)
+        invoice_id = self.match_amount(units, currency, clients, memo_key)
+        if invoice_id is not None:
+            return invoice_id, "amount"
+        invoice_id = self.match_fuzzy(units, currency, clients, memo_key)
+        if invoice_id is not None:
+            return invoice_id, "fuzzy"
+        return None, None
+
+    def match_amount(self, units, currency, clients, memo_key):
+        amounts = self.by_amount.get(currency)
+        bucket = amounts.get(units) if amounts else None
+        if bucket is None:
+            return None
+        # Invoices paid or part-paid since the index was built no longer belong
+        # here; trimming them as they surface keeps busy buckets short.
+        if type(bucket) is int:
+            if self.outstanding[bucket] != units:
+                del amounts[units]
+                return None
+            candidates = [bucket]
+        else:
+            settled = 0
+            while settled < len(bucket) and self.outstanding[bucket[settled]] != units:
+                settled += 1
+            del bucket[:settled]
+            candidates = [i for i in bucket[:AMOUNT_CANDIDATES] if self.outstanding[i] == units]
+        # A payer named in the memo rules out other clients' invoices that
+        # happen to be for the same amount.
+        if clients:
+            candidates = [i for i in candidates if self.client_key[i] in clients]
+        if len(candidates) <= 1:
+            return candidates[0] if candidates else None
+        scores = [self.score(i, memo_key) for i in candidates]
+        best = max(scores)
+        # Several invoices for this amount and nothing in the memo to tell them
+        # apart: better reported unmatched than applied to the wrong one.
+        if clients or (best > 0 and scores.count(best) == 1):
+            return candidates[scores.index(best)]
+        return None
+
+    def match_fuzzy(self, units, currency, clients, memo_key):
+        candidates = [
+            i for c in clients for i in self.by_client[c]
+            if self.outstanding[i] > 0 and self.currency[i] == currency
+        ]
+        if not candidates:
+            return None
+        scores = [self.score(i, memo_key) for i in candidates]
+        best = max(scores)
+        if best >= FUZZY_THRESHOLD:
+            return candidates[scores.index(best)]
+        # A client's only open invoice is taken on the payer name alone, but
+        # only for a payment that does not exceed what is still owed on it.
+        if len(candidates) == 1 and units <= self.outstanding[candidates[0]]:
+            return candidates[0]
+        return None
+
+    def score(self, invoice_id, memo_key):
+        return reference_similarity(self.reference[invoice_id], memo_key)
+
+# Share of the invoice number found as one contiguous run in the memo, so
+# "INV20250000123" scores 11/14 against a memo quoting "2025 0000123". Runs
+# shorter than the threshold score 0, which lets the search stop there.
+def reference_similarity(reference, memo_key):
+    length = len(reference)
+    for size in range(length, max(math.ceil(length * FUZZY_THRESHOLD), 1) - 1, -1):
+        for start in range(length - size + 1):
+            if reference[start:start + size] in memo_key:
+                return size / length
+    return 0
+
+def reconcile(transactions, index):
+    results = []
+    for txn in transactions:
+        result = {**txn, "invoice_id": None, "client_id": None, "match_method": None, "status": "unmatched", "remaining": None}
+        if txn["amount"] <= 0:
+            result["status"] = "ignored"
+            results.append(result)
+            continue
+
+        units = to_minor_units(txn["amount"], txn["currency"])
+        invoice_id, method = index.match(units, txn["currency"], txn["memo"])
+        if invoice_id is not None:
+            index.outstanding[invoice_id] -= units
+            remaining = index.outstanding[invoice_id]
+            result.update({
+                "invoice_id": invoice_id,
+                "client_id": index.client_id[invoice_id],
+                "match_method": method,
+                "status": "paid" if remaining == 0 else "partial" if remaining > 0 else "overpaid",
+                "remaining": Decimal(remaining).scaleb(-currency_decimals(txn["currency"])),
+            })
+        results.append(result)
+    return results
+
+def summarize(results):
+    summary = defaultdict(int)
+    for result in results:
+        summary[result["status"]] += 1
+    return dict(summary)
+
+# Lines already imported (same FITID, or same CSV line) are dropped before
+# matching so a re-uploaded statement cannot pay an invoice twice.
+def import_statement(filename, data, default_currency="USD", day_first=None):
+    transactions = parse_statement(filename, data, default_currency, day_first)
+    known = get_known_payment_fingerprints(t["fingerprint"] for t in transactions)
+    fresh = [t for t in transactions if t["fingerprint"] not in known]
+    results = reconcile(fresh, InvoiceIndex(iter_open_invoices())) if fresh else []
+    save_payments([r for r in results if r["status"] != "ignored"])
+    return results, len(transactions) - len(fresh)
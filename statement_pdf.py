@@ -0,0 +1,162 @@
+from io import BytesIO
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.lib import colors
+
+from currency import CURRENCIES, format_amounts, format_currency
+
+STATEMENT_COLUMNS = ["Date", "Invoice #", "Due", "Amount", "Balance"]
+STATEMENT_COL_WIDTHS = [1.1*inch, 2.0*inch, 1.1*inch, 1.2*inch, 1.3*inch]
+STATEMENT_CHUNK_ROWS = 100
+
+AGING_BUCKETS = [
+    ("current", "Current"),
+    ("days_1_30", "1-30 days"),
+    ("days_31_60", "31-60 days"),
+    ("days_61_90", "61-90 days"),
+    ("days_over_90", "90+ days"),
+]
+
+ROW_STYLE = TableStyle([
+    ('FONTSIZE', (0,0), (-1,-1), 8),
+    ('ALIGN', (3,0), (-1,-1), 'RIGHT'),
+    ('LINEBELOW', (0,0), (-1,-1), 0.25, colors.lightgrey),
+    ('TOPPADDING', (0,0), (-1,-1), 3),
+    ('BOTTOMPADDING', (0,0), (-1,-1), 3),
+])
+
+# ReportLab's build loop only ever looks at the front of the story: it checks
+# len(), reads [0], deletes [0] and pushes split remainders back to the front.
+# Topping the list up from a generator whenever its length is asked for keeps
+# just a few flowables alive at a time, however many rows the statement has.
+class StreamedStory(list):
+    def __init__(self, head, tail, low_water=4):
+        super().__init__(head)
+        self.tail = tail
+        self.low_water = low_water
+
+    def __len__(self):
+        while self.tail is not None and super().__len__() < self.low_water:
+            try:
+                self.append(next(self.tail))
+            except StopIteration:
+                self.tail = None
+        return super().__len__()
+
+# The amount columns of a chunk are formatted together once it is full.
+def finish_chunk(chunk, totals, balances, currency_code):
+    for row, total, balance in zip(chunk, format_amounts(totals, currency_code), format_amounts(balances, currency_code)):
+        row.extend((total, balance))
+    return chunk
+
+def statement_rows(rows, currency_code):
+    balance = 0
+    chunk, totals, balances = [], [], []
+    for invoice_date, invoice_number, due_date, total in rows:
+        balance += total
+        chunk.append([str(invoice_date), invoice_number, str(due_date) if due_date else ""])
+        totals.append(total)
+        balances.append(balance)
+        if len(chunk) == STATEMENT_CHUNK_ROWS:
+            yield finish_chunk(chunk, totals, balances, currency_code)
+            chunk, totals, balances = [], [], []
+    if chunk:
+        yield finish_chunk(chunk, totals, balances, currency_code)
+
+def statement_flowables(rows, currency_code, styles):
+    first = True
+    for chunk in statement_rows(rows, currency_code):
+        if first:
+            chunk = [STATEMENT_COLUMNS] + chunk
+        table = Table(chunk, colWidths=STATEMENT_COL_WIDTHS, hAlign='LEFT')
+        table.setStyle(ROW_STYLE)
+        if first:
+            table.setStyle(TableStyle([
+                ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#3B82F6")),
+                ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+                ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+            ]))
+            first = False
+        yield table
+    if first:
+        yield Paragraph("No invoices in this period.", styles["Normal"])
+
+def create_statement_pdf(client, currency_code, start_date, end_date, as_of, aging, rows, output=None):
+    buffer = output if output is not None else BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.9*inch)
+    styles = getSampleStyleSheet()
+
+    def later_pages(canv, doc):
+        canv.saveState()
+        canv.setFont('Helvetica', 8)
+        canv.setFillColor(colors.HexColor("#6B7280"))
+        canv.drawString(doc.leftMargin + 6, letter[1] - 0.45*inch,
+                        f"Statement for {client['name']} ({currency_code}), {start_date} to {end_date}, continued")
+        canv.drawRightString(doc.leftMargin + 6 + sum(STATEMENT_COL_WIDTHS), letter[1] - 0.45*inch, f"Page {doc.page}")
+        # Column titles for continuation pages, lined up with the row tables
+        # (which sit inside the frame's 6pt padding).
+        x = doc.leftMargin + 6
+        canv.setFillColor(colors.HexColor("#3B82F6"))
+        canv.rect(x, letter[1] - 0.85*inch, sum(STATEMENT_COL_WIDTHS), 0.25*inch, stroke=0, fill=1)
+        canv.setFillColor(colors.white)
+        canv.setFont('Helvetica-Bold', 8)
+        for i, (title, width) in enumerate(zip(STATEMENT_COLUMNS, STATEMENT_COL_WIDTHS)):
+            if i >= 3:
+                canv.drawRightString(x + width - 6, letter[1] - 0.78*inch, title)
+            else:
+                canv.drawString(x + 6, letter[1] - 0.78*inch, title)
+            x += width
+        canv.restoreState()
+
+    head = []
+    header_table = Table([
+        [Paragraph(f"<font size=24 color='#1E3A8A'><b>STATEMENT</b></font>", styles["Normal"]),
+         Paragraph(f"<font size=10>As of <b>{as_of}</b></font>", styles["Normal"])]
+    ], colWidths=[4*inch, 2*inch])
+    header_table.setStyle(TableStyle([
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('ALIGN', (1,0), (1,0), 'RIGHT'),
+    ]))
+    head.append(header_table)
+    head.append(Spacer(1, 20))
+
+    address = (client.get("address") or "").replace(chr(10), '<br/>')
+    head.append(Paragraph(f"<b>Account:</b><br/>{client['name']}<br/>{client['email']}<br/>{address}", styles["Normal"]))
+    head.append(Spacer(1, 12))
+
+    meta_table = Table([
+        ["Period", f"{start_date} to {end_date}"],
+        ["Currency", f"{CURRENCIES[currency_code]['name']} ({currency_code})"],
+        ["Invoices", str(aging["invoice_count"])],
+        ["Invoiced", format_currency(float(aging["total"]), currency_code)],
+        ["Outstanding", format_currency(float(aging["outstanding"]), currency_code)],
+    ], colWidths=[1.5*inch, 4*inch], hAlign='LEFT')
+    meta_table.setStyle(TableStyle([
+        ('FONTNAME', (0,0), (0,-1), 'Helvetica-Bold'),
+        ('TEXTCOLOR', (0,0), (0,-1), colors.HexColor("#374151")),
+    ]))
+    head.append(meta_table)
+    head.append(Spacer(1, 12))
+
+    aging_table = Table([
+        [label for _, label in AGING_BUCKETS],
+        [format_currency(float(aging[key]), currency_code) for key, _ in AGING_BUCKETS],
+    ], hAlign='LEFT')
+    aging_table.setStyle(TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#F3F4F6")),
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('ALIGN', (0,0), (-1,-1), 'RIGHT'),
+        ('GRID', (0,0), (-1,-1), 1, colors.lightgrey),
+        ('PADDING', (0,0), (-1,-1), 6),
+    ]))
+    head.append(Paragraph("<b>Aging</b>", styles["Normal"]))
+    head.append(Spacer(1, 5))
+    head.append(aging_table)
+    head.append(Spacer(1, 20))
+
+    story = StreamedStory(head, statement_flowables(rows, currency_code, styles))
+    doc.build(story, onLaterPages=later_pages)
+    buffer.seek(0)
+    return buffer
@@ -1,2 +1,3 @@
-import main.py2
-main.py2.main()
+from app import main
+
+main()
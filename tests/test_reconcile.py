@@ -0,0 +1,96 @@
+from decimal import Decimal
+
+import pytest
+
+from reconcile import parse_csv, parse_ofx
+
+
+def csv_amounts(*amounts, currency="USD"):
+    lines = ["date,amount,currency,memo"] + [f'2025-03-01,"{amount}",{currency},INV-{i}' for i, amount in enumerate(amounts)]
+    return [t["amount"] for t in parse_csv("\n".join(lines).encode())]
+
+
+def test_amount_decimal_point():
+    assert csv_amounts("1,234.56", "12.50") == [Decimal("1234.56"), Decimal("12.50")]
+
+
+def test_amount_decimal_comma():
+    assert csv_amounts("1.234,56", "123,45") == [Decimal("1234.56"), Decimal("123.45")]
+
+
+def test_amount_grouping_only():
+    assert csv_amounts("1,234,567", "1,234") == [Decimal("1234567"), Decimal("1234")]
+    assert csv_amounts("1.234.567", "1.234") == [Decimal("1234567"), Decimal("1234")]
+
+
+def test_amount_ambiguous_follows_statement():
+    assert csv_amounts("1,234", "12.50") == [Decimal("1234"), Decimal("12.50")]
+    assert csv_amounts("1.234", "12,50") == [Decimal("1234"), Decimal("12.50")]
+
+
+def test_amount_negative_and_noise():
+    assert csv_amounts("(12.50)", "-1,000.00", "USD 3.00") == [Decimal("-12.50"), Decimal("-1000.00"), Decimal("3.00")]
+    assert csv_amounts("€ 1 234,56", "12,50-") == [Decimal("1234.56"), Decimal("-12.50")]
+
+
+def test_amount_three_digits_group_in_two_decimal_currencies():
+    assert csv_amounts("1,234", "2,500") == [Decimal("1234"), Decimal("2500")]
+    assert csv_amounts("1.234", currency="EUR") == [Decimal("1234")]
+    assert csv_amounts("1,234", currency="JPY") == [Decimal("1234")]
+
+
+def test_amount_three_decimal_currency():
+    assert csv_amounts("10.630", "1,250.500", currency="KWD") == [Decimal("10.630"), Decimal("1250.500")]
+    assert csv_amounts("10,630", "1.250,500", currency="KWD") == [Decimal("10.630"), Decimal("1250.500")]
+
+
+def test_amount_ambiguous_statement_rejected():
+    with pytest.raises(ValueError):
+        csv_amounts("1,234", "2,500", currency="KWD")
+
+
+def test_amount_mixed_separators_rejected():
+    with pytest.raises(ValueError):
+        csv_amounts("1,50", "1.50")
+
+
+def test_ofx_amounts_default_to_decimal_point():
+    data = b"<OFX><CURDEF>KWD<STMTTRN><DTPOSTED>20250301<TRNAMT>1.234<FITID>1</STMTTRN></OFX>"
+    assert [t["amount"] for t in parse_ofx(data)] == [Decimal("1.234")]
+
+
+def csv_dates(*dates, day_first=None):
+    lines = ["date,amount,memo"] + [f"{d},10.00,INV-{i}" for i, d in enumerate(dates)]
+    return [t["payment_date"].isoformat() for t in parse_csv("\n".join(lines).encode(), day_first=day_first)]
+
+
+def test_date_iso():
+    assert csv_dates("2025-03-04", "2025-12-31") == ["2025-03-04", "2025-12-31"]
+
+
+def test_date_month_first_decided_by_one_line():
+    assert csv_dates("03/04/2025", "12/31/2025") == ["2025-03-04", "2025-12-31"]
+
+
+def test_date_day_first_decided_by_one_line():
+    assert csv_dates("03/04/2025", "31/12/2025") == ["2025-04-03", "2025-12-31"]
+
+
+def test_date_dotted():
+    assert csv_dates("03.04.2025", "31.12.2025") == ["2025-04-03", "2025-12-31"]
+
+
+def test_date_compact_and_dashed():
+    assert csv_dates("20250304") == ["2025-03-04"]
+    assert csv_dates("03-04-2025", "31-12-2025") == ["2025-04-03", "2025-12-31"]
+
+
+def test_date_ambiguous_needs_order():
+    with pytest.raises(ValueError):
+        csv_dates("03/04/2025", "05/06/2025")
+    assert csv_dates("03/04/2025", day_first=False) == ["2025-03-04"]
+    assert csv_dates("03/04/2025", day_first=True) == ["2025-04-03"]
+
+
+def test_date_same_day_and_month_is_not_ambiguous():
+    assert csv_dates("04/04/2025") == ["2025-04-04"]
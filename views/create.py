@@ -0,0 +1,224 @@
+import os
+import streamlit as st
+from io import BytesIO
+
+from currency import CURRENCIES, format_currency, round_amount
+from db import get_templates, save_template, save_invoice_history, invoice_field_errors
+from drafts import autosave_draft
+from journal import get_invoice_journal
+from forms import LINE_ITEM_COUNT, load_template_into_form, reset_form
+from logos import pdf_logo
+from preview import cached_preview_pdf, live_preview
+
+def render():
+    st.title("Create Invoice")
+    st.markdown("### Generate beautiful PDF invoices in 3 seconds — no signup, no BS")
+    
+    templates = get_templates()
+    if templates:
+        template_options = ["-- New Invoice --"] + [t["template_name"] for t in templates]
+        current_template_names = [t["template_name"] for t in templates if t["id"] == st.session_state.template_loaded_id]
+        current_index = 0
+        if current_template_names:
+            try:
+                current_index = template_options.index(current_template_names[0])
+            except ValueError:
+                current_index = 0
+        
+        selected_template = st.selectbox("Load from template", template_options, index=current_index, key="template_selector")
+        
+        if selected_template == "-- New Invoice --":
+            if st.session_state.template_loaded_id is not None:
+                reset_form()
+        else:
+            template = next((t for t in templates if t["template_name"] == selected_template), None)
+            if template and template["id"] != st.session_state.template_loaded_id:
+                load_template_into_form(template)
+                st.rerun()
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        your_name = st.text_input("Your Name / Business", key="your_name", max_chars=255)
+        your_email = st.text_input("Your Email", key="your_email")
+        your_address = st.text_area("Your Address", height=100, key="your_address")
+
+    with col2:
+        client_name = st.text_input("Client Name", key="client_name", max_chars=255)
+        client_email = st.text_input("Client Email", key="client_email", max_chars=255)
+        client_address = st.text_area("Client Address", height=100, key="client_address")
+
+    st.markdown("### Invoice Details")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        invoice_number = st.text_input("Invoice #", key="invoice_number", max_chars=100)
+    with col2:
+        invoice_date = st.date_input("Invoice Date", key="invoice_date")
+    with col3:
+        due_date = st.date_input("Due Date", key="due_date")
+    with col4:
+        currency = st.selectbox("Currency", list(CURRENCIES.keys()), index=st.session_state.currency_index, key="currency_selector")
+        if list(CURRENCIES.keys()).index(currency) != st.session_state.currency_index:
+            st.session_state.currency_index = list(CURRENCIES.keys()).index(currency)
+
+    currency_symbol = CURRENCIES[currency]["symbol"]
+
+    st.markdown("### Line Items")
+    items = []
+    for i in range(LINE_ITEM_COUNT):
+        with st.expander(f"Item {i+1} {'(optional)' if i>0 else ''}", expanded=i==0):
+            col1, col2, col3 = st.columns([3,1,1])
+            with col1:
+                desc = st.text_input("Description", key=f"desc{i}")
+            with col2:
+                qty = st.number_input("Qty", 1, 100, key=f"qty{i}")
+            with col3:
+                rate = st.number_input(f"Rate ({currency_symbol})", 0.0, 100000.0, key=f"rate{i}")
+            if desc:
+                rate = round_amount(rate, currency)
+                items.append({"desc": desc, "qty": qty, "rate": rate, "total": round_amount(qty * rate, currency)})
+
+    tax_rate = st.slider("Tax Rate (%)", 0, 30, key="tax_rate")
+    notes = st.text_area("Additional Notes (optional)", key="notes")
+
+    subtotal = round_amount(sum(item["total"] for item in items if "total" in item), currency)
+    tax = round_amount(subtotal * tax_rate / 100, currency)
+    total = round_amount(subtotal + tax, currency)
+
+    col1, col2, col3 = st.columns([2,1,1])
+    with col2:
+        st.metric("Subtotal", format_currency(subtotal, currency))
+    with col3:
+        st.metric("Total", format_currency(total, currency), f"+{format_currency(tax, currency)} tax")
+
+    invoice = {
+        "invoice_number": invoice_number,
+        "invoice_date": invoice_date,
+        "due_date": due_date,
+        "your_name": your_name,
+        "your_email": your_email,
+        "your_address": your_address,
+        "client_name": client_name,
+        "client_email": client_email,
+        "client_address": client_address,
+        "currency": currency,
+        "items": items,
+        "subtotal": subtotal,
+        "tax_rate": tax_rate,
+        "tax": tax,
+        "total": total,
+        "notes": notes
+    }
+
+    autosave_draft()
+
+    with st.expander("Preview", expanded=True):
+        if st.toggle("Live preview", value=True, key="live_preview"):
+            live_preview(invoice)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Generate & Download PDF Invoice", type="primary", use_container_width=True):
+            field_errors = invoice_field_errors(invoice)
+            if field_errors:
+                st.error(f"Cannot generate this invoice: {'; '.join(field_errors)}.")
+            else:
+                with st.spinner("Generating your invoice..."):
+                    from invoice_pdf import create_invoice_pdf, pdf_download_button
+
+                    preview_pdf = cached_preview_pdf(invoice)
+                    pdf_buffer = BytesIO(preview_pdf) if preview_pdf else create_invoice_pdf(invoice, pdf_logo())
+                    pdf_bytes = pdf_buffer.getvalue()
+                
+                    invoice_data = {
+                        "invoice_number": invoice_number,
+                        "invoice_date": invoice_date,
+                        "due_date": due_date,
+                        "client_name": client_name,
+                        "client_email": client_email,
+                        "client_address": client_address,
+                        "your_name": your_name,
+                        "subtotal": subtotal,
+                        "tax": tax,
+                        "total": total,
+                        "currency": currency,
+                        "items": items
+                    }
+                    journal = get_invoice_journal()
+                    try:
+                        if journal is None:
+                            save_invoice_history(invoice_data, pdf_bytes)
+                        else:
+                            journal.append(invoice_data, pdf_bytes)
+                    except OSError:
+                        # The journal directory stopped being writable: save synchronously.
+                        save_invoice_history(invoice_data, pdf_bytes)
+                
+                    pdf_download_button(
+                        pdf_buffer,
+                        invoice_number,
+                        type="secondary",
+                        use_container_width=True
+                    )
+                    st.success("Invoice ready and saved to history! Click above to download.")
+                    st.balloons()
+
+    with col2:
+        with st.expander("Save as Template"):
+            template_name = st.text_input("Template Name", f"Template - {client_name}")
+            if st.button("Save Template", use_container_width=True):
+                template_data = {
+                    "template_name": template_name,
+                    "client_name": client_name,
+                    "client_email": client_email,
+                    "client_address": client_address,
+                    "your_name": your_name,
+                    "your_email": your_email,
+                    "your_address": your_address,
+                    "currency": currency,
+                    "tax_rate": tax_rate,
+                    "notes": notes
+                }
+                save_template(template_data)
+                st.success(f"Template '{template_name}' saved!")
+                st.rerun()
+
+    st.markdown("---")
+    
+    with st.expander("Email Invoice to Client"):
+        st.info("Configure your SMTP settings in the Settings page to enable email delivery.")
+        smtp_server = os.environ.get("SMTP_SERVER", "")
+        if smtp_server:
+            email_subject = st.text_input("Email Subject", f"Invoice {invoice_number} from {your_name}")
+            email_body = st.text_area("Email Body", f"""Dear {client_name},
+
+Please find attached invoice {invoice_number} for {format_currency(total, currency)}.
+
+Payment is due by {due_date}.
+
+Thank you for your business!
+
+Best regards,
+{your_name}""")
+            
+            if st.button("Send Invoice via Email", use_container_width=True):
+                try:
+                    from invoice_pdf import create_invoice_pdf
+                    from mailer import send_invoice_email
+
+                    pdf_buffer = create_invoice_pdf(invoice, pdf_logo())
+                    send_invoice_email(pdf_buffer.getvalue(), invoice_number, your_email, client_email, email_subject, email_body)
+                    
+                    st.success(f"Invoice sent to {client_email}!")
+                except Exception as e:
+                    st.error(f"Failed to send email: {str(e)}")
+        else:
+            st.warning("SMTP not configured. Add SMTP_SERVER, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, and SMTP_FROM to your environment variables.")
+
+    st.markdown("---")
+    st.markdown("""
+    **Loving this? Unlock the full AI toolkit:**  
+    Get **Outfit Roaster** (£9.99 lifetime) – Unlimited AI outfit roasts with zero mercy.  
+    Perfect for freelancers: Bill like a pro, roast like a savage.  
+    [Buy Now on Gumroad →](https://drwitt.gumroad.com/l/zfbdxb)  
+    (30-day money-back, source code included)
+    """)
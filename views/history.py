@@ -0,0 +1,188 @@
+import streamlit as st
+from datetime import datetime, timedelta
+
+from currency import CURRENCIES, format_amounts, format_currency
+from db import get_invoice_history, get_invoice_pdf, get_clients, get_client_ledger, get_client_aging, iter_client_invoices
+from journal import get_invoice_journal
+from reconcile import import_statement, summarize
+
+def render():
+    st.title("Invoice History")
+    st.markdown("View and download your previously generated invoices")
+    
+    clients = get_clients()
+    client_options = {"All Clients": None}
+    client_options.update({f"{c['name']} <{c['email']}>": c["id"] for c in clients})
+    
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        search_query = st.text_input("Search invoices", placeholder="Search by invoice #, client name, or email...")
+    with col2:
+        client_label = st.selectbox("Client", list(client_options.keys()))
+        client_id = client_options[client_label]
+    with col3:
+        date_options = {
+            "All Time": None,
+            "Last 7 Days": datetime.today() - timedelta(days=7),
+            "Last 30 Days": datetime.today() - timedelta(days=30),
+            "Last 90 Days": datetime.today() - timedelta(days=90),
+        }
+        date_filter_label = st.selectbox("Date Range", list(date_options.keys()))
+        date_filter = date_options[date_filter_label]
+    
+    with st.expander("Import Bank Statement"):
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            statement_file = st.file_uploader("Bank statement (CSV or OFX)", type=["csv", "ofx", "qfx"])
+        with col2:
+            import_currency = st.selectbox("Default currency", list(CURRENCIES.keys()), key="import_currency")
+            date_orders = {"Detect": None, "Day first": True, "Month first": False}
+            day_first = date_orders[st.selectbox("Date order", list(date_orders.keys()), key="import_date_order")]
+        
+        if statement_file is not None and st.button("Reconcile Payments", use_container_width=True):
+            with st.spinner("Matching payments to open invoices..."):
+                try:
+                    results, skipped = import_statement(statement_file.name, statement_file.getvalue(), import_currency, day_first)
+                    st.session_state.reconcile_report = (results, skipped)
+                except ValueError as e:
+                    st.error(f"Could not read statement: {str(e)}")
+        
+        if "reconcile_report" in st.session_state:
+            results, skipped = st.session_state.reconcile_report
+            summary = summarize(results)
+            cols = st.columns(4)
+            cols[0].metric("Paid in full", summary.get("paid", 0) + summary.get("overpaid", 0))
+            cols[1].metric("Partially paid", summary.get("partial", 0))
+            cols[2].metric("Unmatched", summary.get("unmatched", 0))
+            cols[3].metric("Already imported", skipped)
+            for status, label in [("unmatched", "Unmatched payments"), ("partial", "Partial payments"), ("overpaid", "Overpayments")]:
+                rows = [r for r in results if r["status"] == status]
+                if rows:
+                    st.markdown(f"**{label}**")
+                    currencies = [r["currency"] for r in rows]
+                    amounts = format_amounts([r["amount"] for r in rows], currencies)
+                    remaining = format_amounts([r["remaining"] or 0 for r in rows], currencies)
+                    st.dataframe([
+                        {
+                            "Date": r["payment_date"],
+                            "Amount": amount,
+                            "Memo": r["memo"],
+                            "Matched by": r["match_method"] or "",
+                            "Remaining": "" if r["remaining"] is None else left,
+                        }
+                        for r, amount, left in zip(rows, amounts, remaining)
+                    ], use_container_width=True, hide_index=True)
+    
+    if client_id:
+        ledger = get_client_ledger(client_id)
+        with st.expander("Client Ledger", expanded=True):
+            if ledger:
+                balances = {}
+                for entry in ledger:
+                    balances[entry["currency"]] = entry["running_balance"]
+                cols = st.columns(len(balances))
+                for col, (currency_code, balance) in zip(cols, balances.items()):
+                    col.metric(f"Balance ({currency_code})", format_currency(float(balance), currency_code))
+                currencies = [entry["currency"] for entry in ledger]
+                amounts = format_amounts([entry["amount"] for entry in ledger], currencies)
+                running = format_amounts([entry["running_balance"] for entry in ledger], currencies)
+                st.dataframe([
+                    {
+                        "Date": entry["entry_date"],
+                        "Type": entry["entry_type"].title(),
+                        "Reference": entry["reference"],
+                        "Amount": amount,
+                        "Balance": balance,
+                    }
+                    for entry, amount, balance in zip(ledger, amounts, running)
+                ], use_container_width=True, hide_index=True)
+            else:
+                st.info("No ledger entries for this client yet.")
+        
+        if ledger:
+            with st.expander("Account Statement"):
+                client = next(c for c in clients if c["id"] == client_id)
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    statement_currency = st.selectbox("Currency", sorted({entry["currency"] for entry in ledger}), key="statement_currency")
+                with col2:
+                    statement_start = st.date_input("From", datetime.today() - timedelta(days=365), key="statement_start")
+                with col3:
+                    statement_end = st.date_input("To", datetime.today(), key="statement_end")
+                
+                if st.button("Generate Statement", use_container_width=True):
+                    with st.spinner("Building statement..."):
+                        from statement_pdf import create_statement_pdf
+                        
+                        as_of = datetime.today().date()
+                        aging = get_client_aging(client_id, statement_currency, statement_start, statement_end, as_of)
+                        rows = iter_client_invoices(client_id, statement_currency, statement_start, statement_end)
+                        statement_buffer = create_statement_pdf(client, statement_currency, statement_start, statement_end, as_of, aging, rows)
+                        st.download_button(
+                            "Download Statement",
+                            data=statement_buffer,
+                            file_name=f"Statement_{client['name']}_{statement_start}_{statement_end}.pdf",
+                            mime="application/pdf",
+                            use_container_width=True
+                        )
+    
+    invoices = get_invoice_history(search_query if search_query else None, date_filter, client_id)
+    
+    journal = get_invoice_journal()
+    pending = journal.pending_count() if journal else 0
+    if pending:
+        st.caption(f"{pending} newly generated invoice{'s' if pending != 1 else ''} still saving; refresh in a moment.")
+    if journal and journal.dead_letters:
+        st.warning(f"{journal.dead_letters} generated invoice(s) could not be saved to history and were set aside in {journal.directory} (*.dead).")
+    
+    if invoices:
+        with st.expander("Revenue Report"):
+            from fx import get_rate_table, monthly_totals
+            
+            table = get_rate_table()
+            reporting_currencies = table.currencies()
+            reporting_currency = st.selectbox("Reporting currency", reporting_currencies, index=reporting_currencies.index(table.base), key="reporting_currency")
+            months, totals, counts, missing = monthly_totals(invoices, reporting_currency, table)
+            if missing:
+                st.warning(f"{missing} invoice(s) left out: no exchange rate on or before their invoice date. Upload rates under Settings.")
+            if any(counts):
+                st.bar_chart({"Month": months, "Revenue": totals}, x="Month", y="Revenue")
+                st.dataframe([
+                    {"Month": month, "Invoices": count, "Revenue": revenue}
+                    for month, revenue, count in zip(months, format_amounts(totals, reporting_currency), counts)
+                ], use_container_width=True, hide_index=True)
+        
+        st.markdown(f"**{len(invoices)} invoice(s) found**")
+        
+        currencies = [invoice["currency"] for invoice in invoices]
+        invoice_totals = format_amounts([invoice["total"] for invoice in invoices], currencies)
+        paid = format_amounts([invoice["amount_paid"] for invoice in invoices], currencies)
+        for invoice, total, amount_paid in zip(invoices, invoice_totals, paid):
+            with st.container():
+                col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
+                with col1:
+                    st.markdown(f"**{invoice['invoice_number']}**")
+                    st.caption(f"{invoice['client_name']}")
+                with col2:
+                    st.markdown(f"Date: {invoice['invoice_date']}")
+                    st.caption(f"Due: {invoice['due_date']}")
+                with col3:
+                    st.markdown(f"**{total}**")
+                    if invoice['amount_paid'] >= invoice['total']:
+                        st.caption("Paid")
+                    elif invoice['amount_paid'] > 0:
+                        st.caption(f"Paid {amount_paid}")
+                with col4:
+                    pdf_result = get_invoice_pdf(invoice['id'])
+                    if pdf_result:
+                        pdf_data, inv_num = pdf_result
+                        st.download_button(
+                            "Download",
+                            data=bytes(pdf_data),
+                            file_name=f"Invoice_{inv_num}.pdf",
+                            mime="application/pdf",
+                            key=f"dl_{invoice['id']}"
+                        )
+                st.divider()
+    else:
+        st.info("No invoices found. Create your first invoice to see it here!")
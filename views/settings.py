@@ -0,0 +1,74 @@
+import os
+import streamlit as st
+
+from db import get_logo, save_logo, delete_logo, save_fx_rates
+from logos import logo_hash, process_logo
+from preview import get_preview_renderer
+
+def render():
+    st.title("Settings")
+    
+    st.markdown("### Logo Upload")
+    st.markdown("Upload your business logo to appear on invoices")
+    
+    current_logo = get_logo("preview")
+    if current_logo:
+        st.image(bytes(current_logo), width=150, caption="Current Logo")
+        if st.button("Remove Logo", type="secondary"):
+            delete_logo()
+            get_preview_renderer().clear()
+            st.success("Logo removed!")
+            st.rerun()
+    
+    uploaded_logo = st.file_uploader("Upload Logo (PNG, JPG)", type=["png", "jpg", "jpeg"])
+    if uploaded_logo:
+        logo_bytes = uploaded_logo.getvalue()
+        variants = process_logo(logo_hash(logo_bytes), logo_bytes)
+        
+        st.image(variants["preview"], width=150, caption="Preview")
+        
+        if st.button("Save Logo", type="primary"):
+            save_logo(variants["pdf"], variants["preview"], variants["hash"])
+            get_preview_renderer().clear()
+            st.success("Logo saved! It will appear on your invoices.")
+            st.rerun()
+    
+    st.markdown("---")
+    st.markdown("### Exchange Rates")
+    st.markdown("Daily rates used to report totals across currencies. CSV columns: `date`, `currency`, `rate` (units per 1 base currency)")
+    
+    # fx brings in numpy, so it is only imported once rates are saved.
+    rates_file = os.environ.get("FX_RATES_FILE")
+    if rates_file:
+        st.info(f"Rates are read from {rates_file}")
+    else:
+        uploaded_rates = st.file_uploader("Upload Rates (CSV)", type=["csv"])
+        if uploaded_rates and st.button("Save Rates", type="primary"):
+            from fx import FX_BASE_CURRENCY, get_rate_table, parse_rates_csv
+
+            try:
+                rates = parse_rates_csv(uploaded_rates.getvalue().decode("utf-8-sig"))
+                save_fx_rates(rates)
+                get_rate_table.clear()
+                st.success(f"Saved {len(rates)} rates against {FX_BASE_CURRENCY}.")
+            except (KeyError, ValueError) as e:
+                st.error(f"Could not read rates: {str(e)}")
+    
+    st.markdown("---")
+    st.markdown("### Email Configuration")
+    st.markdown("Configure SMTP settings to send invoices directly to clients")
+    
+    st.info("""
+    To enable email delivery, add these environment variables:
+    - **SMTP_SERVER**: Your SMTP server (e.g., smtp.gmail.com)
+    - **SMTP_PORT**: SMTP port (usually 587 for TLS)
+    - **SMTP_USER**: Your email username
+    - **SMTP_PASSWORD**: Your email password or app password
+    - **SMTP_FROM**: The 'From' email address
+    """)
+    
+    smtp_configured = os.environ.get("SMTP_SERVER", "") != ""
+    if smtp_configured:
+        st.success("SMTP is configured!")
+    else:
+        st.warning("SMTP is not configured. Email delivery is disabled.")
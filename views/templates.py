@@ -0,0 +1,32 @@
+import streamlit as st
+
+from db import get_templates, delete_template
+from forms import load_template_into_form
+
+def render():
+    st.title("Client Templates")
+    st.markdown("Save and manage templates for repeat clients")
+    
+    templates = get_templates()
+    
+    if templates:
+        st.markdown(f"**{len(templates)} template(s) saved**")
+        
+        for template in templates:
+            with st.container():
+                col1, col2, col3 = st.columns([3, 1, 1])
+                with col1:
+                    st.markdown(f"**{template['template_name']}**")
+                    st.caption(f"Client: {template['client_name']} | Currency: {template['currency']}")
+                with col2:
+                    if st.button("Use", key=f"use_{template['id']}", use_container_width=True):
+                        load_template_into_form(template)
+                        st.session_state.page = "create"
+                        st.rerun()
+                with col3:
+                    if st.button("Delete", key=f"del_{template['id']}", use_container_width=True, type="secondary"):
+                        delete_template(template['id'])
+                        st.rerun()
+                st.divider()
+    else:
+        st.info("No templates saved yet. Create an invoice and save it as a template!")